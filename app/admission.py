@@ -0,0 +1,104 @@
+import asyncio
+import math
+import os
+import time
+
+from dotenv import load_dotenv
+
+from app.deadline import remaining
+from app.metrics import ADMISSIONS, CallbackGauge, registry, timed
+
+load_dotenv()
+
+# Questions answered at once; more wait in a bounded queue, and beyond that get a fast 503.
+ADMISSION_CONCURRENCY = int(os.getenv("ADMISSION_CONCURRENCY", "32"))
+ADMISSION_QUEUE_SIZE = int(os.getenv("ADMISSION_QUEUE_SIZE", "64"))
+# Longest wait in the queue; a request that cannot start by then is rejected rather than
+# left to eat its whole budget waiting.
+ADMISSION_QUEUE_TIMEOUT = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", "5"))
+
+
+class Overloaded(Exception):
+    """Raised when a request is not admitted; `retry_after` is in whole seconds."""
+
+    def __init__(self, retry_after):
+        super().__init__("Server is at capacity, retry later.")
+        self.retry_after = retry_after
+
+
+class Ticket:
+    """An admitted request's slot; release() is idempotent."""
+
+    def __init__(self, controller):
+        self.controller = controller
+        self.started = time.monotonic()
+        self.released = False
+
+    def release(self):
+        if not self.released:
+            self.released = True
+            self.controller._release(time.monotonic() - self.started)
+
+
+class AdmissionController:
+    """Concurrency limit with a bounded FIFO queue in front of it.
+
+    Rejecting early keeps the admitted requests' latency bounded by the queue timeout plus
+    their own service time, instead of every request slowing down together.
+    """
+
+    def __init__(self, concurrency=ADMISSION_CONCURRENCY, queue_size=ADMISSION_QUEUE_SIZE,
+                 queue_timeout=ADMISSION_QUEUE_TIMEOUT):
+        self.concurrency = concurrency
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.active = 0
+        self.waiting = 0
+        self.service_time = 1.0  # moving average of seconds per admitted request
+        self._semaphore = asyncio.Semaphore(concurrency)
+
+    def retry_after(self) -> int:
+        """Seconds until the queue ahead has likely drained."""
+        return max(1, math.ceil(self.service_time * (self.waiting + 1) / self.concurrency))
+
+    def _reject(self):
+        ADMISSIONS.inc(result="rejected")
+        raise Overloaded(self.retry_after())
+
+    async def acquire(self, deadline=None) -> Ticket:
+        """Admits a request or raises Overloaded; queues while all slots are busy."""
+        if not self._semaphore.locked():
+            await self._semaphore.acquire()
+            ADMISSIONS.inc(result="admitted")
+        else:
+            if self.waiting >= self.queue_size:
+                self._reject()
+            left = remaining(deadline, "queue")
+            timeout = self.queue_timeout if left is None else min(self.queue_timeout, left)
+            self.waiting += 1
+            try:
+                with timed("queue"):
+                    await asyncio.wait_for(self._semaphore.acquire(), timeout)
+            except TimeoutError:
+                self._reject()
+            finally:
+                self.waiting -= 1
+            ADMISSIONS.inc(result="queued")
+        self.active += 1
+        return Ticket(self)
+
+    def _release(self, seconds):
+        self.active -= 1
+        self.service_time += 0.1 * (seconds - self.service_time)
+        self._semaphore.release()
+
+    def stats(self) -> dict:
+        return {"active": self.active, "waiting": self.waiting, "concurrency": self.concurrency,
+                "queue_size": self.queue_size}
+
+
+admission = AdmissionController()
+
+registry.register(CallbackGauge(
+    "agent_admission_requests", "Requests running or waiting in the admission queue.", ["state"],
+    lambda: {("active",): admission.active, ("waiting",): admission.waiting}))
@@ -1,116 +1,339 @@
-from typing import TypedDict, Literal
+import asyncio
+import os
+from typing import TypedDict, Literal, Optional
 from langchain_openai import ChatOpenAI
-from langchain_core.messages import SystemMessage, HumanMessage
+from langchain_core.messages import AIMessage, SystemMessage, HumanMessage
+from langgraph.config import get_stream_writer
+from langgraph.constants import TAG_NOSTREAM
 from langgraph.graph import StateGraph, END
-from app.graph import graph_db
+from app.answers import NOT_FOUND, render_answer
+from app.cache import SingleFlight, answer_cache, cypher_cache, fold
+from app.classifier import local_classifier
+from app.deadline import REQUEST_TIMEOUT, DeadlineExceeded, checks_deadline, deadline_after, remaining, within
+from app.graph import CYPHER_TIMEOUT, async_graph_db, rewrite_for_indexes
+from app.metrics import (
+    ANSWER_SOURCES, ASK_RESULTS, CLASSIFICATIONS, CYPHER_SOURCES, CYPHER_VALIDATIONS, LLM_PROMPT_CACHE,
+    LLM_SECONDS, LLM_TOKENS, timed, timed_node,
+)
+from app.schema import graph_schema
+from app.search import SEARCH_TOP_K, confident_hit, grounding_hits, search_index
+from app.serialize import serialize_results
+from app.snapshot import backend_from_env
+from app.speculation import SpeculationBudget
+from app.templates import KEY_LOOKUPS, is_descriptive, match_template
+from app.validation import CYPHER_EXPLAIN, clean_cypher, explain_errors, validate_cypher
 from dotenv import load_dotenv
 
 load_dotenv()
 
 # --- Config ---
-LLM = ChatOpenAI(model="gpt-4o-mini", temperature=0)
+# stream_usage keeps token counts on streamed (answer) calls too.
+LLM = ChatOpenAI(model="gpt-4o-mini", temperature=0, stream_usage=True)
+# Intermediate LLM calls (routing, Cypher) are hidden from token streaming; only answers stream.
+INTERNAL_CALL = {"tags": [TAG_NOSTREAM]}
+# Route confidently matched questions in-process; the LLM only decides the unsure ones.
+LOCAL_CLASSIFIER = os.getenv("LOCAL_CLASSIFIER", "1") == "1"
+# Answer common question shapes with parameterized Cypher templates instead of LLM generation.
+CYPHER_TEMPLATES = os.getenv("CYPHER_TEMPLATES", "1") == "1"
+# Resolve descriptive questions to nodes with the local search index; weaker hits ground generation.
+SEARCH_RESOLVE = os.getenv("SEARCH_RESOLVE", "1") == "1"
+# Check generated Cypher against the schema before running it, with one LLM repair attempt.
+VALIDATE_CYPHER = os.getenv("VALIDATE_CYPHER", "1") == "1"
+# Phrase empty, single-value and short-list results from templates instead of the LLM.
+RENDER_ANSWERS = os.getenv("RENDER_ANSWERS", "1") == "1"
+# Speculative mode overlaps LLM classification with Cypher (and optionally general answer) generation.
+SPECULATIVE_MODE = os.getenv("SPECULATIVE_MODE", "0") == "1"
+SPECULATE_GENERAL = os.getenv("SPECULATE_GENERAL", "0") == "1"
+speculation_budget = SpeculationBudget(max_calls=int(os.getenv("SPECULATIVE_BUDGET", "120")))
+# Graph reads go to Neo4j, or to an in-memory snapshot in front of it (GRAPH_BACKEND=snapshot).
+graph_backend = backend_from_env(async_graph_db)
+# Startup makes one tiny LLM request so the first user does not pay for the TLS handshake.
+LLM_WARMUP = os.getenv("LLM_WARMUP", "1") == "1"
+# Questions in flight at once for ask_many(); keep it under the LLM provider's rate limits.
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "8"))
+# Overall budget for one /ask/batch in seconds (0: none); each question also gets its own
+# REQUEST_TIMEOUT from when it starts.
+BATCH_TIMEOUT = float(os.getenv("BATCH_TIMEOUT", "0"))
 
 # --- State ---
 class AgentState(TypedDict):
     question: str
+    deadline: Optional[float]  # time.monotonic() by which the answer is due; None for no limit
     classification: str
     context: str
     answer: str
+    failed: bool  # the graph step failed (invalid or failing Cypher); the answer is not cached
 
-# --- Nodes ---
+# --- Helpers ---
 
-def classify_question(state: AgentState):
-    """Classifies the question as 'graph' (ITC specific data) or 'general'."""
-    question = state["question"]
-    prompt = f"""
-    You are a classifier for the 'ITC BLIDA' (ITCommunity Club) AI assistant.
-    Determine if the user's question requires querying the Knowledge Graph about the club's internal data or if it is general conversation.
+def emit(event: str, **data):
+    """Publishes a progress event on LangGraph's 'custom' stream (no-op when not streaming)."""
+    get_stream_writer()({"event": event, **data})
 
-    Knowledge Graph covers:
-    - Members (names, roles, departments, what they organize)
-    - Departments and their focus areas
-    - Events (ITC TALKS, ITCup, WelcomeDay, DesignCraft, Open Source Sprint)
-    - Projects/Workshops (e.g., Smart Campus App, Club Website Revamp, AI Study Track)
-    - Partners and sponsors supporting events or projects
+async def call_llm(site: str, messages, config=None, deadline=None):
+    """Invokes the LLM, recording latency and token usage under `site`; cut short at `deadline`."""
+    with timed(f"llm.{site}", LLM_SECONDS, site=site):
+        response = await within(deadline, LLM.ainvoke(messages, config=config), f"llm.{site}")
+    usage = getattr(response, "usage_metadata", None) or {}
+    cached = (usage.get("input_token_details") or {}).get("cache_read") or 0
+    LLM_TOKENS.inc(usage.get("input_tokens", 0), site=site, kind="prompt")
+    LLM_TOKENS.inc(usage.get("output_tokens", 0), site=site, kind="completion")
+    LLM_TOKENS.inc(cached, site=site, kind="cached")
+    LLM_PROMPT_CACHE.inc(site=site, result="hit" if cached else "miss")
+    return response
 
-    Respond with ONLY 'graph' or 'general'.
+async def entity_index(force=False):
+    """The local classifier's entity index, loaded from the graph on first use."""
+    if await local_classifier.ensure_built(graph_backend, force=force):
+        cypher_cache.set_entities(local_classifier.entities.values())
+    return local_classifier
 
-    Question: {question}
-    """
-    response = LLM.invoke([HumanMessage(content=prompt)])
+async def search_hits(question: str):
+    """Top search index hits for the question, refreshing the index when the graph changed."""
+    if not SEARCH_RESOLVE:
+        return []
+    await search_index.ensure_current(graph_backend)
+    return search_index.search(question, k=SEARCH_TOP_K)
+
+# --- Prompts ---
+# Every prompt is a byte-stable system message followed by the per-request human message, so
+# the provider can serve the shared prefix from its prompt cache.
+
+CLASSIFY_SYSTEM = """You are a classifier for the 'ITC BLIDA' (ITCommunity Club) AI assistant.
+Determine if the user's question requires querying the Knowledge Graph about the club's internal data or if it is general conversation.
+
+Knowledge Graph covers:
+- Members (names, roles, departments, what they organize)
+- Departments and their focus areas
+- Events (ITC TALKS, ITCup, WelcomeDay, DesignCraft, Open Source Sprint)
+- Projects/Workshops (e.g., Smart Campus App, Club Website Revamp, AI Study Track)
+- Partners and sponsors supporting events or projects
+
+Respond with ONLY 'graph' or 'general'."""
+
+GENERAL_SYSTEM = "You are a helpful assistant for ITC BLIDA, a scientific club at Saad Dahleb University."
+
+CYPHER_SYSTEM = """Task: Generate a Cypher query for Neo4j to answer the question for ITC BLIDA club.
+
+Instructions:
+- RETURN only the relevant data.
+- Do NOT markdown format the query (no ```cypher).
+- Case insensitive search is safer (use toLower()).
+- Return ONLY the Cypher query text.
+- IMPORTANT: Use only the node labels, relationship types and properties in the schema below.
+
+Schema:
+"""
+
+ANSWER_SYSTEM = """You are the AI assistant for ITC BLIDA (ITCommunity Club at Saad Dahleb University).
+Formulate a concise, natural language answer to the question based on the database results.
+If results are empty, say you couldn't find information in the club's records."""
+
+async def cypher_system_prompt() -> str:
+    """CYPHER_SYSTEM plus the introspected schema; identical bytes for the life of the process."""
+    await graph_schema.ensure_loaded(graph_backend)
+    return CYPHER_SYSTEM + graph_schema.text
+
+# --- Nodes ---
+
+async def classify_locally(question: str) -> Optional[str]:
+    """Returns 'graph'/'general' for confidently matched questions, None when unsure."""
+    if not LOCAL_CLASSIFIER:
+        return None
+    return (await entity_index()).classify(question)
+
+async def classify_with_llm(question: str, deadline=None) -> str:
+    messages = [SystemMessage(content=CLASSIFY_SYSTEM), HumanMessage(content=f"Question: {question}")]
+    response = await call_llm("classify", messages, config=INTERNAL_CALL, deadline=deadline)
     classification = response.content.strip().lower()
     # Fallback if LLM creates verbiage
-    if "graph" in classification:
-        return {"classification": "graph"}
-    return {"classification": "general"}
+    return "graph" if "graph" in classification else "general"
 
-def run_general_agent(state: AgentState):
-    """Handles general chitchat."""
+async def classify_question(state: AgentState):
+    """Classifies the question as 'graph' (ITC specific data) or 'general'."""
     question = state["question"]
-    response = LLM.invoke([SystemMessage(content="You are a helpful assistant for ITC BLIDA, a scientific club at Saad Dahleb University."), HumanMessage(content=question)])
-    return {"answer": response.content}
+    classification, source = await classify_locally(question), "local"
+    if classification is None:
+        classification, source = await classify_with_llm(question, state.get("deadline")), "llm"
+    CLASSIFICATIONS.inc(classification=classification, source=source)
+    emit("classification", classification=classification, source=source)
+    return {"classification": classification}
 
-def run_graph_agent(state: AgentState):
-    """Generates Cypher, queries Neo4j, and formulates an answer."""
-    question = state["question"]
+async def general_answer(question: str, config=None, deadline=None) -> str:
+    messages = [SystemMessage(content=GENERAL_SYSTEM), HumanMessage(content=question)]
+    response = await call_llm("general", messages, config=config, deadline=deadline)
+    return response.content
+
+async def run_general_agent(state: AgentState):
+    """Handles general chitchat."""
+    return {"answer": await general_answer(state["question"], deadline=state.get("deadline"))}
+
+class InvalidCypher(ValueError):
+    """Generated Cypher still failed validation after the repair attempt."""
+
+    def __init__(self, query, errors):
+        super().__init__("; ".join(errors))
+        self.query = query
+        self.errors = errors
 
-    # 1. Generate Cypher
-    schema_desc = """
-    Nodes:
-    - Member (id, name, role, joined, expertise)
-    - Department (name, focus)
-    - Event (name, date, description, location, theme, format)
-    - Project (name, year, status, description)
-    - Partner (name, kind, focus)
-
-    Relationships:
-    - (:Member)-[:MEMBER_OF]->(:Department)
-    - (:Member)-[:ORGANIZES]->(:Event)
-    - (:Member)-[:CONTRIBUTES_TO {scope}]->(:Project)
-    - (:Department)-[:HOSTS]->(:Event)
-    - (:Department)-[:LEADS]->(:Project)
-    - (:Project)-[:FEATURED_IN]->(:Event)
-    - (:Partner)-[:SPONSORS]->(:Event)
-    - (:Partner)-[:SUPPORTS]->(:Project)
+async def generate_cypher(question: str, hits=(), deadline=None, rejected=None, errors=()) -> str:
+    """Asks the LLM for a Cypher query answering the question, grounded by search `hits`.
+
+    With `rejected` and its validation `errors`, asks for a corrected query instead.
     """
-    cypher_prompt = f"""
-    Task: Generate a Cypher query for Neo4j to answer the question for ITC BLIDA club.
-    Schema: {schema_desc}
-    
-    Question: {question}
-    
-    instructions:
-    - RETURN only the relevant data.
-    - Do NOT markdown format the query (no ```cypher).
-    - Case insensitive search is safer (use toLower()).
-    - Return ONLY the Cypher query text.
-    - IMPORTANT: Node labels are 'Member', 'Department', 'Event'. 
+    request = f"Question: {question}"
+    if hits:
+        request += "\nLikely matching nodes: " + "; ".join(f"{hit.label} {hit.name!r}" for hit in hits)
+    messages = [SystemMessage(content=await cypher_system_prompt()), HumanMessage(content=request)]
+    site = "cypher"
+    if rejected is not None:
+        site = "cypher_repair"
+        messages += [
+            AIMessage(content=rejected),
+            HumanMessage(content="That query is invalid for this schema:\n"
+                                 + "\n".join(f"- {error}" for error in errors)
+                                 + "\nReturn ONLY the corrected Cypher query."),
+        ]
+    cypher_response = await call_llm(site, messages, config=INTERNAL_CALL, deadline=deadline)
+    return clean_cypher(cypher_response.content)
+
+async def cypher_errors(query: str) -> list:
+    errors = validate_cypher(query, await graph_schema.ensure_loaded(graph_backend))
+    if not errors and CYPHER_EXPLAIN:
+        errors = await explain_errors(graph_backend, query)
+    return errors
+
+async def validated_cypher(question: str, hits=(), deadline=None) -> str:
+    """generate_cypher() checked against the schema, with at most one repair round-trip.
+
+    Raises InvalidCypher when the repaired query is still invalid, so it is never run.
     """
+    query = await generate_cypher(question, hits, deadline)
+    if not VALIDATE_CYPHER:
+        return query
+    errors = await cypher_errors(query)
+    if not errors:
+        CYPHER_VALIDATIONS.inc(result="valid")
+        return query
+    emit("validation", query=query, errors=errors)
+    query = await generate_cypher(question, hits, deadline, rejected=query, errors=errors)
+    errors = await cypher_errors(query)
+    if errors:
+        CYPHER_VALIDATIONS.inc(result="invalid")
+        raise InvalidCypher(query, errors)
+    CYPHER_VALIDATIONS.inc(result="repaired")
+    return query
+
+async def resolve_cypher(question: str, deadline=None):
+    """Returns (query, parameters, source) with source 'template', 'search', 'cache' or 'llm'."""
+    entities = []
+    if CYPHER_TEMPLATES:
+        entities = (await entity_index()).find_entities(question)
+        match = match_template(question, entities)
+        if match:
+            template, parameters = match
+            return template.query, parameters, "template"
+    query = await cypher_cache.aget(question)
+    if query is not None:
+        return query, None, "cache"
+    hits = await search_hits(question)
+    if hits:
+        emit("search", hits=[{"label": h.label, "name": h.name, "score": round(h.score, 2)} for h in hits])
+    # Exactly named entities are left to templates/generation; search covers partial names.
+    hit = confident_hit(hits) if not entities and is_descriptive(question) else None
+    if hit is not None and hit.label in KEY_LOOKUPS:
+        return KEY_LOOKUPS[hit.label].query, {"key": hit.key}, "search"
+    return await validated_cypher(question, grounding_hits(hits), deadline), None, "llm"
+
+async def graph_answer(question: str, pending_cypher=None, deadline=None):
+    """Queries Neo4j and formulates an answer; `pending_cypher` is an already started resolve_cypher task."""
+    # 1. Generate Cypher (invalid queries are neither run nor answered from)
+    try:
+        query, parameters, source = await (pending_cypher or resolve_cypher(question, deadline))
+    except InvalidCypher as e:
+        context = f"Invalid Cypher: {e.query}\nProblems: {e}"
+        emit("cypher", query=e.query, parameters=None, rows=0, source="llm", error=str(e))
+        ANSWER_SOURCES.inc(source="invalid")
+        emit("token", text=NOT_FOUND)
+        return {"answer": NOT_FOUND, "context": context, "failed": True}
     
-    cypher_response = LLM.invoke([HumanMessage(content=cypher_prompt)])
-    query = cypher_response.content.strip().replace("```cypher", "").replace("```", "")
-    
-    print(f"DEBUG: Generated Query: {query}")
+    CYPHER_SOURCES.inc(source=source)
     
-    # 2. Execute Query
+    # 2. Execute Query (case-insensitive lookups are rewritten to hit the indexes)
+    rendered, failed = None, False
     try:
-        results = graph_db.query(query)
-        context = str(results)
+        # The server-side timeout stops Neo4j's work too, not just our wait for it.
+        left = remaining(deadline, "neo4j")
+        timeout = CYPHER_TIMEOUT if left is None else min(CYPHER_TIMEOUT, left)
+        read = graph_backend.read_query(rewrite_for_indexes(query), parameters, timeout=timeout)
+        results = await within(deadline, read, "neo4j")
+        context, stats = serialize_results(results)
+        emit("cypher", query=query, parameters=parameters, rows=len(results), source=source,
+             tokens=stats["tokens"], tokens_saved=stats["tokens_saved"])
+        if source == "llm":
+            await cypher_cache.aput(question, query)
+        if RENDER_ANSWERS:
+            rendered = render_answer(results)
+    except DeadlineExceeded:
+        raise
     except Exception as e:
-        context = f"Error executing query: {e}"
+        context, failed = f"Error executing query: {e}", True
+        emit("cypher", query=query, parameters=parameters, rows=0, source=source, error=str(e))
         
-    # 3. Formulate Answer
-    answer_prompt = f"""
-    You are the AI assistant for ITC BLIDA (ITCommunity Club at Saad Dahleb University).
-    Question: {question}
-    Database Results: {context}
+    # 3. Formulate Answer (small, flat results need no synthesis)
+    if rendered is not None:
+        ANSWER_SOURCES.inc(source="template")
+        emit("token", text=rendered)
+        return {"answer": rendered, "context": context}
+
+    request = f"Question: {question}\nDatabase Results: {context}"
+    messages = [SystemMessage(content=ANSWER_SYSTEM), HumanMessage(content=request)]
+    final_answer = await call_llm("answer", messages, deadline=deadline)
+    ANSWER_SOURCES.inc(source="llm")
     
-    Formulate a concise, natural language answer based on the results. 
-    If results are empty, say you couldn't find information in the club's records.
+    return {"answer": final_answer.content, "context": context, "failed": failed}
+
+async def run_graph_agent(state: AgentState):
+    """Generates Cypher, queries Neo4j, and formulates an answer."""
+    return await graph_answer(state["question"], deadline=state.get("deadline"))
+
+async def run_speculative(state: AgentState):
+    """Starts Cypher (and optionally general answer) generation alongside LLM classification.
+
+    The branch the classifier picks is kept and the other is cancelled. Speculative calls
+    are capped by `speculation_budget`; once it is spent this behaves like the serial graph.
     """
-    final_answer = LLM.invoke([HumanMessage(content=answer_prompt)])
-    
-    return {"answer": final_answer.content, "context": context}
+    question, deadline = state["question"], state.get("deadline")
+    classification, source = await classify_locally(question), "local"
+    cypher_task = general_task = None
+    if classification is None:
+        source = "llm"
+        if speculation_budget.acquire():
+            cypher_task = asyncio.create_task(resolve_cypher(question, deadline))
+        if SPECULATE_GENERAL and speculation_budget.acquire():
+            # Not streamed: tokens for a branch that may be dropped must not reach the client.
+            general_task = asyncio.create_task(general_answer(question, config=INTERNAL_CALL, deadline=deadline))
+        try:
+            classification = await classify_with_llm(question, deadline)
+        except BaseException:
+            for task in (cypher_task, general_task):
+                if task:
+                    speculation_budget.discard(task)
+            raise
+        loser = general_task if classification == "graph" else cypher_task
+        if loser:
+            speculation_budget.discard(loser)
+    CLASSIFICATIONS.inc(classification=classification, source=source)
+    emit("classification", classification=classification, source=source)
+
+    if classification == "graph":
+        result = await graph_answer(question, pending_cypher=cypher_task, deadline=deadline)
+    elif general_task:
+        result = {"answer": await general_task}
+        emit("token", text=result["answer"])
+    else:
+        result = await run_general_agent(state)
+    return {"classification": classification, **result}
 
 # --- Router ---
 
@@ -121,24 +344,135 @@ def route_step(state: AgentState) -> Literal["graph_agent", "general_agent"]:
 
 # --- Graph Definition ---
 
-workflow = StateGraph(AgentState)
+def build_workflow(speculative: bool = SPECULATIVE_MODE):
+    workflow = StateGraph(AgentState)
 
-workflow.add_node("classifier", classify_question)
-workflow.add_node("graph_agent", run_graph_agent)
-workflow.add_node("general_agent", run_general_agent)
+    if speculative:
+        workflow.add_node("speculative", timed_node("speculative", checks_deadline("speculative", run_speculative)))
+        workflow.set_entry_point("speculative")
+        workflow.add_edge("speculative", END)
+        return workflow.compile()
 
-workflow.set_entry_point("classifier")
+    workflow.add_node("classifier", timed_node("classifier", checks_deadline("classifier", classify_question)))
+    workflow.add_node("graph_agent", timed_node("graph_agent", checks_deadline("graph_agent", run_graph_agent)))
+    workflow.add_node("general_agent", timed_node("general_agent", checks_deadline("general_agent", run_general_agent)))
 
-workflow.add_conditional_edges(
-    "classifier",
-    route_step,
-    {
-        "graph_agent": "graph_agent",
-        "general_agent": "general_agent"
-    }
-)
+    workflow.set_entry_point("classifier")
+
+    workflow.add_conditional_edges(
+        "classifier",
+        route_step,
+        {
+            "graph_agent": "graph_agent",
+            "general_agent": "general_agent"
+        }
+    )
+
+    workflow.add_edge("graph_agent", END)
+    workflow.add_edge("general_agent", END)
+
+    return workflow.compile()
+
+agent_app = build_workflow()
+
+# --- Answer API ---
+
+inflight_answers = SingleFlight()
+
+async def answer_key(question: str):
+    """Answer-cache key for a question, or None when the graph version is unavailable."""
+    try:
+        version = await graph_backend.current_version()
+    except Exception as e:
+        print(f"Graph version unavailable, answer cache bypassed: {e}")
+        return None
+    return (version, fold(question))
+
+async def cached_answer(key):
+    return await answer_cache.aget(key) if key is not None else None
+
+async def answer_question(question: str, deadline=None, admission=None) -> dict:
+    """Runs agent_app for one question, through the answer cache and single-flight.
+
+    Identical folded questions asked while one is running share its execution; finished
+    answers are reused until the graph version changes or ANSWER_CACHE_TTL expires. The
+    run carries the first caller's `deadline`; each caller stops waiting at its own.
+    With `admission` (an AdmissionController), the caller that starts a run holds one of
+    its slots until the run ends; cache hits and callers joining a run take none.
+    """
+    key = await answer_key(question)
+    result = await cached_answer(key)
+    if result is not None:
+        ASK_RESULTS.inc(result="cache")
+        return {**result, "question": question}
+
+    async def invoke():
+        result = await agent_app.ainvoke({"question": question, "deadline": deadline})
+        result.pop("deadline", None)
+        return result
+
+    async def run():
+        # Only the caller that starts the run takes an admission slot; joiners ride along.
+        ticket = await admission.acquire(deadline) if admission is not None else None
+        try:
+            if key is None:
+                return await invoke(), True
+            # With a shared cache backend this also waits on other workers running the question.
+            return await answer_cache.compute_once(
+                key, invoke, lease=REQUEST_TIMEOUT, store=lambda result: not result.get("failed")
+            )
+        finally:
+            if ticket is not None:
+                ticket.release()
+
+    (result, computed), shared = await within(deadline, inflight_answers.run(key or fold(question), run), "answer")
+    ASK_RESULTS.inc(result="shared" if shared or not computed else "executed")
+    return {**result, "question": question}
+
+# --- Startup ---
+
+async def warm_up():
+    """Opens the Neo4j pool, loads the entity index, schema and search index, and warms the LLM client.
+
+    Called by the API lifespan before it reports ready. The LLM warm-up is a one-token
+    request (LLM_WARMUP=0 skips it).
+    """
+    await graph_backend.warm_up()
+    await entity_index(force=True)
+    if not local_classifier.built:
+        raise RuntimeError("Entity index could not be loaded from the graph.")
+    await graph_schema.ensure_loaded(graph_backend, force=True)
+    if SEARCH_RESOLVE:
+        await search_index.ensure_current(graph_backend)
+    if LLM_WARMUP:
+        with timed("llm.warmup"):
+            await LLM.bind(max_tokens=1).ainvoke([HumanMessage(content="ping")], config=INTERNAL_CALL)
+
+async def shutdown():
+    await graph_backend.close()
+
+# --- Batch API ---
+
+async def ask_many(questions, concurrency=None, timeout=None, deadline=None):
+    """Answers a list of questions concurrently, at most `concurrency` at a time.
+
+    Each question gets `timeout` seconds (at most REQUEST_TIMEOUT) from when it starts, so
+    long batches do not run out of time; `deadline`, if given, bounds the whole batch.
+    Questions that are identical after case/punctuation folding run once. Results keep
+    the input order; a failed question yields {"question", "error"} instead of raising.
+    """
+    semaphore = asyncio.Semaphore(concurrency or BATCH_CONCURRENCY)
 
-workflow.add_edge("graph_agent", END)
-workflow.add_edge("general_agent", END)
+    async def run(question):
+        async with semaphore:
+            try:
+                own = deadline_after(timeout)
+                return await answer_question(question, own if deadline is None else min(own, deadline))
+            except Exception as e:
+                return {"question": question, "error": str(e)}
 
-agent_app = workflow.compile()
+    unique = {}
+    for question in questions:
+        unique.setdefault(fold(question), question)
+    answers = dict(zip(unique, await asyncio.gather(*(run(q) for q in unique.values()))))
+    return [{**answers[fold(q)], "question": q} for q in questions]
@@ -0,0 +1,108 @@
+import os
+import re
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Results up to these sizes are phrased from templates instead of by the LLM.
+ANSWER_MAX_ITEMS = int(os.getenv("ANSWER_MAX_ITEMS", "10"))
+ANSWER_MAX_ROWS = int(os.getenv("ANSWER_MAX_ROWS", "5"))
+ANSWER_MAX_VALUE_CHARS = int(os.getenv("ANSWER_MAX_VALUE_CHARS", "80"))
+
+NOT_FOUND = "I couldn't find information about that in the club's records."
+
+# Column names that are an alias or a property ('organizer', 'm.name', 'Event name'), and
+# a function applied to one ('count(m)', 'collect(DISTINCT m.name)').
+_PLAIN = re.compile(r"^\w[\w ]*(?:\.\w+)?$")
+_CALL = re.compile(r"^(\w+)\((?:DISTINCT\s+)?(\w+(?:\.\w+)?|\*)\)$", re.I)
+
+
+def _label(column: str):
+    """'m.name' -> 'Name', 'event_date' -> 'Event date'; bare variables ('n') -> 'Result'.
+
+    Unaliased expressions come back named after their text: 'count(m)' -> 'Count' and
+    'collect(m.name)' -> 'Name'; any other expression gives None.
+    """
+    call = _CALL.match(column)
+    if call:
+        function, argument = call.group(1).lower(), call.group(2)
+        if function == "count":
+            return "Count"
+        return _label(argument) if function == "collect" else None
+    if not _PLAIN.match(column):
+        return None
+    words = column.rsplit(".", 1)[-1].replace("_", " ").strip()
+    if len(words) <= 2:
+        return "Result"
+    return words[:1].upper() + words[1:]
+
+
+def _plural(label: str) -> str:
+    if label.endswith("s"):
+        return label
+    if label.endswith("y") and label[-2:-1] not in "aeiou":
+        return label[:-1] + "ies"
+    return label + "s"
+
+
+def _join(values) -> str:
+    values = [str(v) for v in values]
+    if len(values) <= 1:
+        return "".join(values)
+    return f"{', '.join(values[:-1])} and {values[-1]}"
+
+
+def _simple(value) -> bool:
+    """Short scalars (or short lists of them) that read fine without rephrasing."""
+    if isinstance(value, list):
+        return len(value) <= ANSWER_MAX_ITEMS and all(_simple(v) and not isinstance(v, list) for v in value)
+    if isinstance(value, str):
+        return len(value) <= ANSWER_MAX_VALUE_CHARS
+    return value is None or isinstance(value, (int, float, bool))
+
+
+def _text(value) -> str:
+    if isinstance(value, list):
+        return _join(v for v in value if v is not None) or "none"
+    if isinstance(value, bool):
+        return "yes" if value else "no"
+    return str(value)
+
+
+def render_answer(results):
+    """Phrases small, flat query results from their column names, or returns None.
+
+    Handles empty results, a single value, one column of up to ANSWER_MAX_ITEMS values
+    and up to ANSWER_MAX_ROWS short rows. Maps (whole nodes), long text, columns named
+    after expressions it cannot label and anything larger are left to the LLM.
+    """
+    rows = [row for row in results if any(v not in (None, []) for v in row.values())]
+    if not rows:
+        return NOT_FOUND
+    if not all(_simple(v) for row in rows for v in row.values()):
+        return None
+    columns = list(dict.fromkeys(key for row in rows for key in row))
+    if any(_label(column) is None for column in columns):
+        return None
+
+    if len(columns) == 1:
+        column = columns[0]
+        values = list(dict.fromkeys(_text(row[column]) for row in rows if row.get(column) is not None))
+        if len(values) == 1:
+            return f"{_label(column)}: {values[0]}."
+        if len(values) <= ANSWER_MAX_ITEMS:
+            return f"{_plural(_label(column))}: {_join(values)}."
+        return None
+
+    if len(rows) > ANSWER_MAX_ROWS:
+        return None
+    lines = []
+    for row in rows:
+        head, *rest = columns
+        details = [f"{_label(c).lower()}: {_text(row[c])}" for c in rest if row.get(c) not in (None, [])]
+        first = _text(row[head]) if row.get(head) is not None else f"{_label(head).lower()}: unknown"
+        lines.append(f"{first} ({', '.join(details)})" if details else first)
+    if len(lines) == 1:
+        return f"{lines[0]}."
+    return "\n".join(f"- {line}" for line in dict.fromkeys(lines))
@@ -0,0 +1,338 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from collections import defaultdict
+from typing import List, Optional
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from pydantic import PrivateAttr
+
+# app.agents builds its ChatOpenAI client at import; the benchmark never calls it.
+os.environ.setdefault("OPENAI_API_KEY", "offline-benchmark")
+
+import app.agents as agents  # noqa: E402
+from app.cache import fold  # noqa: E402
+from app.seeds import load_dataset  # noqa: E402
+from app.specs import NODE_SPECS  # noqa: E402
+from app.serialize import count_tokens  # noqa: E402
+
+QUESTIONS = [
+    "What events does ITC organize?",
+    "Who is the head of Design?",
+    "Tell me about the ITCup.",
+    "Hi, are you a robot?",
+    "Who organizes DesignCraft?",
+    "Which events does Marketing host?",
+    "Who sponsors ITC TALKS 4.0?",
+    "What is the difference between a list and a tuple?",
+]
+
+
+class ScriptedChatModel(BaseChatModel):
+    """Deterministic chat model standing in for gpt-4o-mini.
+
+    The reply depends on which prompt it receives (classifier, Cypher generation or
+    answer); each call sleeps `latency` (+/- `jitter`) seconds and reports usage metadata
+    with real prompt token counts and `completion_tokens` output tokens for answers.
+    Like OpenAI's prompt cache, a system message of at least `prompt_cache_min_tokens`
+    tokens that was sent before is reported as cached prompt tokens.
+    """
+
+    latency: float = 0.3
+    jitter: float = 0.0
+    completion_tokens: int = 40
+    cypher: str = "MATCH (e:Event) RETURN e.name AS event, e.date AS date"
+    seed: int = 0
+    prompt_cache_min_tokens: int = 1024
+    _prefixes: set = PrivateAttr(default_factory=set)
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted"
+
+    def _reply(self, prompt: str) -> str:
+        if "Respond with ONLY 'graph' or 'general'" in prompt:
+            question = prompt.rsplit("Question:", 1)[-1]
+            return "graph" if any(t in fold(question) for t in ("itc", "event", "department", "club")) else "general"
+        if "Generate a Cypher query" in prompt:
+            return self.cypher
+        return " ".join(["word"] * self.completion_tokens)
+
+    def _delay(self, prompt: str) -> float:
+        # Jitter is seeded by the prompt so repeated runs see the same latencies.
+        rng = random.Random(f"{self.seed}:{prompt}")
+        return max(0.0, self.latency + rng.uniform(-self.jitter, self.jitter))
+
+    def _cached_tokens(self, messages) -> int:
+        if not messages or messages[0].type != "system":
+            return 0
+        prefix = str(messages[0].content)
+        tokens = count_tokens(prefix)
+        if tokens < self.prompt_cache_min_tokens:
+            return 0
+        if prefix in self._prefixes:
+            return tokens
+        self._prefixes.add(prefix)
+        return 0
+
+    def _result(self, messages) -> ChatResult:
+        prompt = "\n".join(str(m.content) for m in messages)
+        text = self._reply(prompt)
+        usage = {"input_tokens": count_tokens(prompt), "output_tokens": count_tokens(text),
+                 "input_token_details": {"cache_read": self._cached_tokens(messages)}}
+        usage["total_tokens"] = usage["input_tokens"] + usage["output_tokens"]
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=text, usage_metadata=usage))])
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        prompt = "\n".join(str(m.content) for m in messages)
+        time.sleep(self._delay(prompt))
+        return self._result(messages)
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        prompt = "\n".join(str(m.content) for m in messages)
+        await asyncio.sleep(self._delay(prompt))
+        return self._result(messages)
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        prompt = "\n".join(str(m.content) for m in messages)
+        words = self._result(messages).generations[0].text.split(" ")
+        for word in words:
+            await asyncio.sleep(self._delay(prompt) / len(words))
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=word + " "))
+            if run_manager:
+                await run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+
+
+class InMemoryGraph:
+    """Graph stand-in serving the seed dataset with an injected per-query latency.
+
+    The entity-name lookup gets real names; every other query returns up to `rows` rows
+    built from the dataset's events.
+    """
+
+    def __init__(self, latency=0.005, rows=5):
+        self.latency = latency
+        data = load_dataset()
+        self.entities = [
+            {"label": label, "name": row["name"]}
+            for label, (dataset, _properties) in NODE_SPECS.items()
+            for row in data[dataset]
+        ]
+        self.rows = [{"event": e["name"], "date": e["date"]} for e in data["events"]][:rows]
+        self.queries = 0
+
+    async def query(self, query, parameters=None, **kwargs):
+        self.queries += 1
+        await asyncio.sleep(self.latency)
+        if "labels(n)" in query:
+            return list(self.entities)
+        return [dict(r) for r in self.rows]
+
+    async def read_query(self, query, parameters=None, **kwargs):
+        return await self.query(query, parameters)
+
+    async def current_version(self):
+        return "benchmark"
+
+
+class NodeTimer(BaseCallbackHandler):
+    """Collects wall time per LangGraph node from chain callbacks."""
+
+    run_inline = True
+
+    def __init__(self):
+        self.started = {}
+        self.durations = defaultdict(list)
+
+    def on_chain_start(self, serialized, inputs, *, run_id, metadata=None, **kwargs):
+        name = kwargs.get("name")
+        if metadata and name and metadata.get("langgraph_node") == name:
+            self.started[run_id] = (name, time.perf_counter())
+
+    def on_chain_end(self, outputs, *, run_id, **kwargs):
+        if run_id in self.started:
+            name, started = self.started.pop(run_id)
+            self.durations[name].append(time.perf_counter() - started)
+
+    on_chain_error = on_chain_end
+
+
+class UsageCounter(BaseCallbackHandler):
+    run_inline = True
+
+    def __init__(self):
+        self.calls = 0
+        self.input_tokens = 0
+        self.cached_tokens = 0
+        self.output_tokens = 0
+
+    def on_llm_end(self, response, **kwargs):
+        self.calls += 1
+        for generations in response.generations:
+            for generation in generations:
+                usage = getattr(generation.message, "usage_metadata", None) or {}
+                self.input_tokens += usage.get("input_tokens", 0)
+                self.cached_tokens += (usage.get("input_token_details") or {}).get("cache_read") or 0
+                self.output_tokens += usage.get("output_tokens", 0)
+
+
+def percentile(values, q):
+    if not values:
+        return None
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q
+    low = int(position)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (position - low)
+
+
+def summarize(seconds):
+    return {
+        "count": len(seconds),
+        "mean_ms": round(1000 * sum(seconds) / len(seconds), 2) if seconds else None,
+        "p50_ms": round(1000 * percentile(seconds, 0.50), 2) if seconds else None,
+        "p95_ms": round(1000 * percentile(seconds, 0.95), 2) if seconds else None,
+        "p99_ms": round(1000 * percentile(seconds, 0.99), 2) if seconds else None,
+        "max_ms": round(1000 * max(seconds), 2) if seconds else None,
+    }
+
+
+def swap_backends(llm, graph):
+    """Points app.agents at the fakes and resets state built from the real backends."""
+    agents.LLM = llm
+    agents.graph_backend = graph
+    agents.local_classifier.built = False
+    agents.local_classifier._last_attempt = 0.0
+    agents.cypher_cache.store.clear()
+    agents.answer_cache.clear()
+    agents.search_index.version = None
+    agents.graph_schema.loaded = False
+
+
+async def run_benchmark(target="agent", requests=100, concurrency=10, questions=None):
+    questions = questions or QUESTIONS
+    timer, usage = NodeTimer(), UsageCounter()
+    config = {"callbacks": [timer, usage]}
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, errors = [], 0
+
+    if target == "http":
+        import httpx
+        from app.main import app as api
+
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=api), base_url="http://bench")
+        # The endpoint builds its own config, so node timings come from the callbacks we
+        # cannot inject; only end-to-end latency is measured over HTTP.
+
+        async def call(question):
+            response = await client.post("/ask", json={"question": question})
+            response.raise_for_status()
+    else:
+        client = None
+
+        async def call(question):
+            await agents.agent_app.ainvoke({"question": question}, config=config)
+
+    async def one(i):
+        nonlocal errors
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                await call(questions[i % len(questions)])
+            except Exception:
+                errors += 1
+                return
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    try:
+        await asyncio.gather(*(one(i) for i in range(requests)))
+    finally:
+        if client:
+            await client.aclose()
+    elapsed = time.perf_counter() - started
+
+    return {
+        "target": target,
+        "requests": requests,
+        "concurrency": concurrency,
+        "errors": errors,
+        "seconds": round(elapsed, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else None,
+        "latency": summarize(latencies),
+        "nodes": {name: summarize(values) for name, values in sorted(timer.durations.items())},
+        "llm": {"calls": usage.calls, "input_tokens": usage.input_tokens, "cached_input_tokens": usage.cached_tokens,
+                "output_tokens": usage.output_tokens},
+    }
+
+
+def compare(result, baseline, max_regression):
+    """Prints latency/throughput deltas against a baseline; returns False on regression."""
+    ok = True
+    for metric in ("p50_ms", "p95_ms", "p99_ms"):
+        old, new = baseline["latency"].get(metric), result["latency"].get(metric)
+        if old and new:
+            change = (new - old) / old
+            flag = "REGRESSION" if change > max_regression else ""
+            ok = ok and not flag
+            print(f"{metric}: {old} -> {new} ({change:+.1%}) {flag}")
+    old, new = baseline.get("throughput_rps"), result.get("throughput_rps")
+    if old and new:
+        change = (new - old) / old
+        flag = "REGRESSION" if change < -max_regression else ""
+        ok = ok and not flag
+        print(f"throughput_rps: {old} -> {new} ({change:+.1%}) {flag}")
+    return ok
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Benchmark agent_app or POST /ask offline, with a scripted LLM and an in-process graph.",
+        epilog="Example: python -m app.benchmark --requests 200 --concurrency 20 --out bench.json "
+               "then --baseline bench.json to fail on regressions.",
+    )
+    parser.add_argument("--target", choices=["agent", "http"], default="agent")
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--llm-latency", type=float, default=0.3, help="seconds per LLM call")
+    parser.add_argument("--llm-jitter", type=float, default=0.0)
+    parser.add_argument("--completion-tokens", type=int, default=40)
+    parser.add_argument("--graph-latency", type=float, default=0.005, help="seconds per graph query")
+    parser.add_argument("--prompt-cache-min-tokens", type=int, default=1024,
+                        help="shortest system prompt the scripted LLM reports as cached on reuse")
+    parser.add_argument("--rows", type=int, default=5, help="rows returned per graph query")
+    parser.add_argument("--no-answer-cache", action="store_true",
+                        help="disable the final-answer cache (the http target goes through it)")
+    parser.add_argument("--out", help="write the JSON result here")
+    parser.add_argument("--baseline", help="previous JSON result to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.10)
+    args = parser.parse_args(argv)
+
+    llm = ScriptedChatModel(latency=args.llm_latency, jitter=args.llm_jitter, completion_tokens=args.completion_tokens,
+                           prompt_cache_min_tokens=args.prompt_cache_min_tokens)
+    if args.no_answer_cache:
+        agents.answer_cache.maxsize = 0
+    swap_backends(llm, InMemoryGraph(latency=args.graph_latency, rows=args.rows))
+    result = asyncio.run(run_benchmark(args.target, args.requests, args.concurrency))
+    result["config"] = vars(args)
+    print(json.dumps(result, indent=2))
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(result, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            return 0 if compare(result, json.load(f), args.max_regression) else 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
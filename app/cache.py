@@ -0,0 +1,529 @@
+import asyncio
+import json
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+from app.metrics import register_cache
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+_NON_WORD = re.compile(r"[^\w]+")
+
+# "memory" keeps caches per process; "sqlite" shares them between the workers on one host
+# through a WAL-mode database at CACHE_PATH. The default lives in a per-user directory that
+# is created 0700, so other local users can neither read nor plant entries.
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory")
+CACHE_PATH = os.getenv("CACHE_PATH") or os.path.join(
+    tempfile.gettempdir(), f"itc-agent-{getattr(os, 'getuid', lambda: 'cache')()}", "cache.sqlite3"
+)
+# How often a worker waiting on another's computation checks for the result.
+CACHE_POLL_INTERVAL = float(os.getenv("CACHE_POLL_INTERVAL", "0.05"))
+
+_MISSING = object()
+
+_LITERAL = re.compile(r"'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"")
+_ESCAPE = re.compile(r"\\(.)")
+_SLOT = re.compile(r"<<(\d+)(\|lower)?>>")
+
+
+def fold(text: str) -> str:
+    """Lowercases, strips punctuation and collapses whitespace."""
+    return " ".join(_NON_WORD.sub(" ", text.lower()).split())
+
+
+def _unquote(literal: str) -> str:
+    return _ESCAPE.sub(r"\1", literal[1:-1])
+
+
+def _quote(text: str) -> str:
+    """A single-quoted Cypher string literal for `text`."""
+    return "'" + text.replace("\\", "\\\\").replace("'", "\\'") + "'"
+
+
+def normalize_question(question: str, entities=None):
+    """Returns (key, slots) for a question.
+
+    When `entities` (folded name -> (label, canonical name)) is given, known entity names
+    are replaced by labelled positional slots so "Who organizes DesignCraft?" and "who
+    organizes ITC TALKS 5.0" share the key "who organizes <Event:0>", while a department
+    named in the same position gets a different one; `slots` lists the canonical names in
+    slot order.
+    """
+    key = f" {fold(question)} "
+    slots = []
+    for folded in sorted(entities or {}, key=len, reverse=True):
+        needle = f" {folded} "
+        if folded and needle in key:
+            label, name = entities[folded]
+            key = key.replace(needle, f" <{label}:{len(slots)}> ")
+            slots.append(name)
+    return key.strip(), slots
+
+
+class CacheBackend:
+    """Interface of the agent's caches: size-bounded, with optional TTL and hit/miss stats.
+
+    Subclasses implement _lookup, set, pop, clear, __len__ and stats. `shared` backends are
+    seen by every worker process, so entries must not be cleared on local events.
+    """
+
+    shared = False
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self._leases = {}
+
+    def _lookup(self, key):
+        """The cached value, or _MISSING; does not count as a hit or miss."""
+        raise NotImplementedError
+
+    def get(self, key, default=None):
+        return self._count(self._lookup(key), default)
+
+    async def aget(self, key, default=None):
+        """get() for async code; blocking backends run the lookup off the event loop."""
+        return self._count(await self.call(self._lookup, key), default)
+
+    async def aset(self, key, value):
+        await self.call(self.set, key, value)
+
+    async def call(self, method, *args):
+        """Runs `method(*args)` for async code. Backends that block on I/O run it in a thread."""
+        return method(*args)
+
+    def _count(self, value, default):
+        if value is _MISSING:
+            self.misses += 1
+            return default
+        self.hits += 1
+        return value
+
+    def claim(self, key, seconds) -> bool:
+        """Takes the lease to compute `key` for `seconds`; False while someone else holds it."""
+        now = time.monotonic()
+        if self._leases.get(key, 0) > now:
+            return False
+        self._leases[key] = now + seconds
+        return True
+
+    def release(self, key):
+        self._leases.pop(key, None)
+
+    async def get_or_compute(self, key, factory, lease=60.0, store=None):
+        """Returns (value, computed): the cached value, or `await factory()` stored under `key`.
+
+        Everyone sharing the backend computes a missing key at most once at a time: the
+        lease holder runs `factory` while the others poll for its result. A failed or
+        abandoned computation frees the lease for the next caller, as does a value that
+        `store(value)` declines to cache. Expects the caller to bound its wait (deadline);
+        it does not give up on its own.
+        """
+        value = await self.aget(key, _MISSING)
+        if value is not _MISSING:
+            return value, False
+        return await self.compute_once(key, factory, lease, store)
+
+    async def compute_once(self, key, factory, lease=60.0, store=None):
+        """get_or_compute() for a key the caller has just missed (counted) with get()."""
+        while not await self.call(self.claim, key, lease):
+            await asyncio.sleep(CACHE_POLL_INTERVAL)
+            value = await self.call(self._lookup, key)
+            if value is not _MISSING:
+                self.hits += 1
+                return value, False
+        try:
+            value = await self.call(self._lookup, key)
+            if value is not _MISSING:
+                return value, False
+            value = await factory()
+            if store is None or store(value):
+                await self.call(self.set, key, value)
+            return value, True
+        finally:
+            await self.call(self.release, key)
+
+
+class TTLCache(CacheBackend):
+    """Thread-safe LRU cache with an optional per-entry TTL and hit/miss counters.
+
+    With `max_bytes`, entries are also evicted to keep the summed `sizeof(value)` under
+    the bound; values larger than the bound are not cached at all.
+    """
+
+    def __init__(self, maxsize=1024, ttl=None, max_bytes=None, sizeof=None):
+        super().__init__()
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof or (lambda value: len(repr(value)))
+        self.bytes = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _lookup(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                value, expires, _size = entry
+                if expires is None or expires > time.monotonic():
+                    self._data.move_to_end(key)
+                    return value
+                self._remove(key)
+            return _MISSING
+
+    def set(self, key, value):
+        if self.maxsize <= 0:
+            return
+        size = self.sizeof(value) if self.max_bytes else 0
+        if self.max_bytes and size > self.max_bytes:
+            return
+        expires = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+            self._data[key] = (value, expires, size)
+            self.bytes += size
+            while len(self._data) > self.maxsize or (self.max_bytes and self.bytes > self.max_bytes):
+                self._remove(next(iter(self._data)))
+
+    def pop(self, key, default=None):
+        with self._lock:
+            if key not in self._data:
+                return default
+            return self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.bytes = 0
+
+    def _remove(self, key):
+        value, _expires, size = self._data.pop(key)
+        self.bytes -= size
+        return value
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "bytes": self.bytes,
+        }
+
+
+class SingleFlight:
+    """Runs one coroutine per key at a time; concurrent callers with that key share it.
+
+    The shared task is shielded, so a caller that goes away (client disconnect) does not
+    cancel the work for the others. Exceptions reach every caller and are not remembered.
+    """
+
+    def __init__(self):
+        self._inflight = {}
+
+    def __len__(self):
+        return len(self._inflight)
+
+    async def run(self, key, factory):
+        """Awaits `factory()` for `key`, joining the in-flight run if there is one.
+
+        Returns (result, shared) where `shared` is True for callers that joined.
+        """
+        task = self._inflight.get(key)
+        shared = task is not None
+        if not shared:
+            task = asyncio.ensure_future(factory())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+        return await asyncio.shield(task), shared
+
+    def _finish(self, key, task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()  # retrieved, so an unawaited failure is not logged as lost
+
+
+def _private_directory(path):
+    """Creates `path` 0700 if missing; refuses one that other users can write to."""
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    info = os.stat(path)
+    if info.st_mode & 0o022 or (hasattr(os, "getuid") and info.st_uid != os.getuid()):
+        raise PermissionError(f"Cache directory {path} must be owned by this user and not group/world-writable")
+
+
+class SQLiteCache(CacheBackend):
+    """Cache shared by the worker processes on one host through a SQLite database in WAL mode.
+
+    Each cache is a `namespace` in the file at `path`, whose directory is created 0700 and
+    must not be writable by other users. Keys and values are stored as JSON: tuples come
+    back as lists and values JSON cannot represent (Neo4j temporals) as strings. Eviction is
+    approximate LRU on `maxsize` entries and `max_bytes` of encoded values; TTLs use wall
+    time so every process agrees on them. Compute leases live in the same database, which
+    makes get_or_compute() atomic across processes.
+    """
+
+    shared = True
+    # Last-access times are written back at most this often, so reads stay reads.
+    TOUCH_INTERVAL = 30.0
+
+    def __init__(self, namespace, path=CACHE_PATH, maxsize=1024, ttl=None, max_bytes=None):
+        super().__init__()
+        self.namespace = namespace
+        self.path = path
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+
+    async def call(self, method, *args):
+        # sqlite3 blocks (up to its 5 s busy timeout on a locked database), so never on the loop.
+        return await asyncio.to_thread(method, *args)
+
+    def _connect(self):
+        # One connection per thread and process; connections must not cross a fork.
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            _private_directory(os.path.dirname(os.path.abspath(self.path)))
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS entries (
+                    namespace TEXT, key TEXT, value TEXT, size INTEGER, expires REAL, accessed REAL,
+                    PRIMARY KEY (namespace, key)
+                ) WITHOUT ROWID;
+                CREATE INDEX IF NOT EXISTS entries_accessed ON entries (namespace, accessed);
+                CREATE TABLE IF NOT EXISTS leases (
+                    namespace TEXT, key TEXT, expires REAL, PRIMARY KEY (namespace, key)
+                ) WITHOUT ROWID;
+            """)
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    @staticmethod
+    def _key(key) -> str:
+        return json.dumps(key, sort_keys=True, default=str)
+
+    def _lookup(self, key):
+        conn = self._connect()
+        row = conn.execute(
+            "SELECT value, expires, accessed FROM entries WHERE namespace = ? AND key = ?",
+            (self.namespace, self._key(key)),
+        ).fetchone()
+        if row is None:
+            return _MISSING
+        value, expires, accessed = row
+        now = time.time()
+        if expires is not None and expires <= now:
+            self.pop(key)
+            return _MISSING
+        if now - accessed > self.TOUCH_INTERVAL:
+            conn.execute("UPDATE entries SET accessed = ? WHERE namespace = ? AND key = ?",
+                         (now, self.namespace, self._key(key)))
+        return json.loads(value)
+
+    def set(self, key, value):
+        if self.maxsize <= 0:
+            return
+        blob = json.dumps(value, default=str)
+        if self.max_bytes and len(blob) > self.max_bytes:
+            return
+        now = time.time()
+        conn = self._connect()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?)",
+                (self.namespace, self._key(key), blob, len(blob), now + self.ttl if self.ttl else None, now),
+            )
+            self._evict(conn, now)
+
+    def _evict(self, conn, now):
+        conn.execute("DELETE FROM entries WHERE namespace = ? AND expires <= ?", (self.namespace, now))
+        count, size = conn.execute(
+            "SELECT count(*), coalesce(sum(size), 0) FROM entries WHERE namespace = ?", (self.namespace,)
+        ).fetchone()
+        if count > self.maxsize:
+            conn.execute(
+                "DELETE FROM entries WHERE namespace = ? AND key IN "
+                "(SELECT key FROM entries WHERE namespace = ? ORDER BY accessed LIMIT ?)",
+                (self.namespace, self.namespace, count - self.maxsize),
+            )
+        if self.max_bytes and size > self.max_bytes:
+            # Oldest first until the running total fits.
+            excess, victims = size - self.max_bytes, []
+            for key, entry_size in conn.execute(
+                "SELECT key, size FROM entries WHERE namespace = ? ORDER BY accessed", (self.namespace,)
+            ):
+                if excess <= 0:
+                    break
+                victims.append((self.namespace, key))
+                excess -= entry_size
+            conn.executemany("DELETE FROM entries WHERE namespace = ? AND key = ?", victims)
+
+    def pop(self, key, default=None):
+        conn = self._connect()
+        row = conn.execute(
+            "DELETE FROM entries WHERE namespace = ? AND key = ? RETURNING value",
+            (self.namespace, self._key(key)),
+        ).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def clear(self):
+        self._connect().execute("DELETE FROM entries WHERE namespace = ?", (self.namespace,))
+
+    def claim(self, key, seconds) -> bool:
+        now = time.time()
+        conn = self._connect()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            claimed = conn.execute(
+                "INSERT INTO leases VALUES (?, ?, ?) "
+                "ON CONFLICT (namespace, key) DO UPDATE SET expires = excluded.expires WHERE leases.expires <= ?",
+                (self.namespace, self._key(key), now + seconds, now),
+            ).rowcount
+        return claimed == 1
+
+    def release(self, key):
+        self._connect().execute("DELETE FROM leases WHERE namespace = ? AND key = ?",
+                                (self.namespace, self._key(key)))
+
+    def __len__(self):
+        return self._connect().execute(
+            "SELECT count(*) FROM entries WHERE namespace = ?", (self.namespace,)
+        ).fetchone()[0]
+
+    def stats(self) -> dict:
+        """Hits and misses are this process's; size and bytes are the shared totals."""
+        count, size = self._connect().execute(
+            "SELECT count(*), coalesce(sum(size), 0) FROM entries WHERE namespace = ?", (self.namespace,)
+        ).fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "size": count,
+            "maxsize": self.maxsize,
+            "bytes": size,
+        }
+
+
+def make_cache(name, maxsize=1024, ttl=None, max_bytes=None, sizeof=None) -> CacheBackend:
+    """Builds cache `name` on the CACHE_BACKEND selected for this deployment."""
+    if CACHE_BACKEND == "sqlite":
+        return SQLiteCache(name, maxsize=maxsize, ttl=ttl, max_bytes=max_bytes)
+    if CACHE_BACKEND != "memory":
+        raise ValueError(f"Unknown CACHE_BACKEND {CACHE_BACKEND!r} (expected 'memory' or 'sqlite')")
+    return TTLCache(maxsize=maxsize, ttl=ttl, max_bytes=max_bytes, sizeof=sizeof)
+
+
+class CypherCache:
+    """Maps normalized questions to previously generated Cypher.
+
+    Queries are stored slotted when every entity named in the question is a whole string
+    literal in the Cypher, so one cached query serves the same question about any entity.
+    Only literals are slotted, and names are re-quoted and escaped when filled in.
+    """
+
+    def __init__(self, maxsize=512, ttl=3600, store=None):
+        self.store = store if store is not None else TTLCache(maxsize=maxsize, ttl=ttl)
+        self.entities = {}
+        self.hits = 0
+        self.misses = 0
+
+    def set_entities(self, entities):
+        """Indexes the (label, name) pairs whose names are slotted out of questions."""
+        self.entities = {fold(name): (label, name) for label, name in entities if fold(name)}
+
+    def get(self, question: str):
+        key, slots = normalize_question(question, self.entities)
+        query = None
+        if slots:
+            template = self.store.get(key)
+            if template is not None:
+                query = self._fill(template, slots)
+        if query is None:
+            query = self.store.get(fold(question))
+        if query is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return query
+
+    async def aget(self, question: str):
+        """get() for async code, off the event loop when the store blocks."""
+        return await self.store.call(self.get, question)
+
+    async def aput(self, question: str, query: str):
+        await self.store.call(self.put, question, query)
+
+    def put(self, question: str, query: str):
+        key, slots = normalize_question(question, self.entities)
+        template = self._slot(query, slots) if slots else None
+        if template is not None:
+            self.store.set(key, template)
+        else:
+            self.store.set(fold(question), query)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            **self.store.stats(),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    @staticmethod
+    def _slot(query: str, slots):
+        """Marks each string literal equal to a slot's name (or its lowercase); None unless all are found."""
+        found = set()
+
+        def mark(match):
+            text = _unquote(match.group(0))
+            for i, name in enumerate(slots):
+                if text == name or text == name.lower():
+                    found.add(i)
+                    return f"<<{i}>>" if text == name else f"<<{i}|lower>>"
+            return match.group(0)
+
+        template = _LITERAL.sub(mark, query)
+        return template if len(found) == len(slots) else None
+
+    @staticmethod
+    def _fill(template: str, slots):
+        def literal(match):
+            name = slots[int(match.group(1))]
+            return _quote(name.lower() if match.group(2) else name)
+
+        return _SLOT.sub(literal, template)
+
+cypher_cache = CypherCache(store=make_cache(
+    "cypher",
+    maxsize=int(os.getenv("CYPHER_CACHE_SIZE", "512")),
+    ttl=float(os.getenv("CYPHER_CACHE_TTL", "3600")),
+))
+# Final answers keyed on (graph version, folded question); a write changes the version.
+answer_cache = make_cache(
+    "answers",
+    maxsize=int(os.getenv("ANSWER_CACHE_SIZE", "1024")),
+    ttl=float(os.getenv("ANSWER_CACHE_TTL", "600")) or None,
+)
+register_cache("cypher", cypher_cache)
+register_cache("answers", answer_cache)
@@ -0,0 +1,166 @@
+import asyncio
+import time
+
+from app.cache import fold
+
+ENTITY_LABELS = ["Member", "Department", "Event", "Project", "Partner"]
+
+ENTITY_QUERY = """
+MATCH (n)
+WHERE n:Member OR n:Department OR n:Event OR n:Project OR n:Partner
+RETURN [l IN labels(n) WHERE l IN $labels][0] AS label, n.name AS name
+"""
+
+RELATIONSHIP_TYPES = [
+    "MEMBER_OF", "ORGANIZES", "CONTRIBUTES_TO", "HOSTS", "LEADS", "FEATURED_IN", "SPONSORS", "SUPPORTS",
+]
+
+PROPERTY_KEYS = [
+    "role", "joined", "expertise", "focus", "date", "description", "location", "theme",
+    "format", "year", "status", "kind", "scope",
+]
+
+# Terms that only make sense when talking about the club itself.
+CLUB_TERMS = [
+    "itc", "blida", "itcommunity", "club", "itcup", "welcomeday", "designcraft",
+    "talks", "saad", "dahleb", "dahlab",
+]
+
+# Words people use for the schema concepts without naming them.
+ROLE_TERMS = [
+    "workshop", "sponsor", "organizer", "contributor", "leader", "supporter", "head",
+    "team", "board", "president", "volunteer", "edition", "hackathon", "bootcamp",
+]
+
+# Conversational cues that never need the knowledge graph on their own.
+GENERAL_CUES = [
+    "hi", "hello", "hey", "good morning", "good evening", "thanks", "thank you", "bye",
+    "how are you", "who are you", "what are you", "are you a robot", "are you a bot",
+    "are you human", "your name", "tell me a joke", "what can you do",
+]
+# Words that may surround a cue ("hi there", "thanks a lot!") without adding a topic.
+CUE_FILLER = {
+    "a", "again", "all", "and", "bot", "buddy", "day", "dear", "everyone", "for", "friend", "great",
+    "guys", "help", "lot", "much", "nice", "ok", "okay", "please", "so", "the", "there", "today",
+    "very", "you", "your",
+}
+
+
+def stem(token: str) -> str:
+    """Crude plural/third-person folding: 'events' -> 'event', 'organizes' -> 'organize'."""
+    if len(token) > 4 and token.endswith(("sses", "xes", "zes", "ches", "shes")):
+        return token[:-2]
+    if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+        return token[:-1]
+    return token
+
+
+def schema_vocabulary():
+    """Stemmed words drawn from labels, relationship types, property keys and role terms."""
+    words = [label.lower() for label in ENTITY_LABELS] + PROPERTY_KEYS + ROLE_TERMS
+    for rel in RELATIONSHIP_TYPES:
+        words += [part for part in rel.lower().split("_") if part not in ("of", "to", "in")]
+    return {stem(w) for w in words}
+
+
+class LocalClassifier:
+    """Routes questions in-process from graph entity names and the schema vocabulary.
+
+    `classify` returns 'graph' or 'general' when the question matches confidently and
+    None when the LLM should decide. Only distinctive entity names and club terms route to
+    the graph on their own; schema words ("date", "team", "project") also occur in general
+    questions, so on their own they leave the decision to the LLM. Questions are 'general'
+    locally only when they are nothing but a greeting or other conversational cue.
+    """
+
+    retry_interval = 60
+
+    def __init__(self):
+        self.entities = {}
+        self.terms = schema_vocabulary()
+        self.club_terms = {stem(t) for t in CLUB_TERMS}
+        self.built = False
+        self.version = None
+        self._last_attempt = 0.0  # last failed load
+        self._lock = asyncio.Lock()
+
+    async def ensure_built(self, graph, force=False) -> bool:
+        """Loads entity names from the graph, again whenever its version changes.
+
+        Returns True when the index was (re)built. Failed loads keep the previous index and
+        are retried after `retry_interval`, or right away with `force`.
+        """
+        try:
+            version = await graph.current_version()
+        except Exception:
+            version = self.version
+        if self.built and version == self.version:
+            return False
+        if not force and time.monotonic() - self._last_attempt < self.retry_interval:
+            return False
+        async with self._lock:
+            if self.built and version == self.version:
+                return False
+            try:
+                rows = await graph.query(ENTITY_QUERY, {"labels": ENTITY_LABELS})
+            except Exception as e:
+                self._last_attempt = time.monotonic()
+                print(f"Local classifier: could not load entity names ({e})")
+                return False
+            self.index(rows)
+            self.version = version
+            return True
+
+    def index(self, rows):
+        """Indexes {label, name} rows returned by ENTITY_QUERY."""
+        self.entities = {fold(r["name"]): (r["label"], r["name"]) for r in rows if r.get("name")}
+        self.built = True
+
+    def find_entities(self, question: str):
+        """Returns (label, name) for every entity named in the question, longest names first."""
+        text = f" {fold(question)} "
+        found = []
+        for folded in sorted(self.entities, key=len, reverse=True):
+            needle = f" {folded} "
+            if needle in text:
+                found.append(self.entities[folded])
+                text = text.replace(needle, " ")
+        return found
+
+    def classify(self, question: str):
+        strong = weak = 0
+        for _label, name in self.find_entities(question):
+            # Multi-word or coined names ("ITC TALKS 5.0", "DesignCraft") are unambiguous;
+            # plain words like "Design" or "Marketing" only count as a hint.
+            if len(name.split()) > 1 or not name[1:].islower():
+                strong += 1
+            else:
+                weak += 1
+
+        folded = fold(question)
+        tokens = [stem(t) for t in folded.split()]
+        strong += sum(t in self.club_terms for t in tokens)
+        weak += sum(t in self.terms for t in tokens)
+
+        if strong:
+            return "graph"
+        if not weak and self.only_cues(folded):
+            return "general"
+        return None
+
+    @staticmethod
+    def only_cues(folded: str) -> bool:
+        """True when the folded question is conversational cues and filler and nothing else.
+
+        "Hi! Tell me about the Smart Campus App" has a cue but also a topic, so it is not.
+        """
+        padded = f" {folded} "
+        found = False
+        for cue in sorted(GENERAL_CUES, key=len, reverse=True):
+            while f" {cue} " in padded:
+                padded = padded.replace(f" {cue} ", " ", 1)
+                found = True
+        return found and all(token in CUE_FILLER for token in padded.split())
+
+
+local_classifier = LocalClassifier()
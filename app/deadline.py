@@ -0,0 +1,63 @@
+import asyncio
+import functools
+import os
+import time
+
+from dotenv import load_dotenv
+
+from app.metrics import DEADLINES_EXCEEDED
+
+load_dotenv()
+
+# Time budget for one question end to end; clients can ask for less with X-Request-Timeout.
+REQUEST_TIMEOUT = float(os.getenv("REQUEST_TIMEOUT", "30"))
+
+
+class DeadlineExceeded(TimeoutError):
+    """The request's time budget ran out before `stage` finished."""
+
+    def __init__(self, stage):
+        super().__init__(f"Request deadline exceeded ({stage})")
+        self.stage = stage
+        DEADLINES_EXCEEDED.inc(stage=stage)
+
+
+def deadline_after(seconds=None) -> float:
+    """Absolute deadline (time.monotonic()) `seconds` from now, capped at REQUEST_TIMEOUT."""
+    budget = REQUEST_TIMEOUT if seconds is None else min(seconds, REQUEST_TIMEOUT)
+    return time.monotonic() + budget
+
+
+def remaining(deadline, stage):
+    """Seconds left before `deadline`, None when there is none; raises once it has passed."""
+    if deadline is None:
+        return None
+    left = deadline - time.monotonic()
+    if left <= 0:
+        raise DeadlineExceeded(stage)
+    return left
+
+
+async def within(deadline, awaitable, stage):
+    """Awaits `awaitable`, cancelling it when the deadline passes."""
+    try:
+        timeout = remaining(deadline, stage)
+    except DeadlineExceeded:
+        if asyncio.iscoroutine(awaitable):
+            awaitable.close()
+        raise
+    try:
+        return await asyncio.wait_for(awaitable, timeout)
+    except TimeoutError:
+        if deadline is not None and time.monotonic() >= deadline:
+            raise DeadlineExceeded(stage) from None
+        raise
+
+
+def checks_deadline(name, node):
+    """Wraps an async LangGraph node so it is skipped once the state's deadline has passed."""
+    @functools.wraps(node)
+    async def wrapper(state):
+        remaining(state.get("deadline"), name)
+        return await node(state)
+    return wrapper
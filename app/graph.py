@@ -1,40 +1,415 @@
+import asyncio
+import json
 import os
-from neo4j import GraphDatabase
+import re
+import time
+from neo4j import GraphDatabase, AsyncGraphDatabase, READ_ACCESS, unit_of_work
 from dotenv import load_dotenv
+from app.cache import make_cache
+from app.metrics import NEO4J_ROWS, NEO4J_SECONDS, register_cache, timed
 
 load_dotenv()
 
+# Create constraints to ensure uniqueness
+SCHEMA_QUERIES = [
+    "CREATE CONSTRAINT IF NOT EXISTS FOR (m:Member) REQUIRE m.id IS UNIQUE",
+    "CREATE CONSTRAINT IF NOT EXISTS FOR (d:Department) REQUIRE d.name IS UNIQUE",
+    "CREATE CONSTRAINT IF NOT EXISTS FOR (e:Event) REQUIRE e.name IS UNIQUE",
+    "CREATE CONSTRAINT IF NOT EXISTS FOR (p:Project) REQUIRE p.name IS UNIQUE",
+    "CREATE CONSTRAINT IF NOT EXISTS FOR (p:Partner) REQUIRE p.name IS UNIQUE",
+]
+
+ENTITY_LABELS = ["Member", "Department", "Event", "Project", "Partner"]
+
+# Full-text index over the searchable text properties, for CONTAINS-style lookups.
+FULLTEXT_INDEX = "entity_text"
+FULLTEXT_PROPERTIES = ["name", "role", "focus", "description", "theme", "expertise"]
+SCHEMA_QUERIES.append(
+    f"CREATE FULLTEXT INDEX {FULLTEXT_INDEX} IF NOT EXISTS FOR (n:{'|'.join(ENTITY_LABELS)}) "
+    f"ON EACH [{', '.join('n.' + p for p in FULLTEXT_PROPERTIES)}]"
+)
+
+# Lowercased copies of key properties, range-indexed, for case-insensitive equality.
+NORMALIZED_PROPERTIES = {"name": "name_lower"}
+for _label in ENTITY_LABELS:
+    for _normalized in NORMALIZED_PROPERTIES.values():
+        SCHEMA_QUERIES.append(
+            f"CREATE INDEX {_label.lower()}_{_normalized} IF NOT EXISTS FOR (n:{_label}) ON (n.{_normalized})"
+        )
+
+# Backfills normalized properties for nodes written without them.
+NORMALIZE_QUERIES = [
+    f"""
+    MATCH (n:{label}) WHERE n.{prop} IS NOT NULL AND (n.{normalized} IS NULL OR n.{normalized} <> toLower(n.{prop}))
+    CALL {{ WITH n SET n.{normalized} = toLower(n.{prop}) }} IN TRANSACTIONS OF 10000 ROWS
+    """
+    for label in ENTITY_LABELS
+    for prop, normalized in NORMALIZED_PROPERTIES.items()
+]
+
+# The graph version is a random token stored in the graph and replaced by every write, so
+# processes caching reads (API workers) notice writes made elsewhere (e.g. app/seeds.py).
+GRAPH_VERSION_QUERY = "MATCH (v:GraphVersion {id: 'graph'}) RETURN v.value AS value"
+BUMP_VERSION_QUERY = "MERGE (v:GraphVersion {id: 'graph'}) SET v.value = randomUUID() RETURN v.value AS value"
+
+# Limits applied by read_query() to LLM-generated Cypher.
+CYPHER_TIMEOUT = float(os.getenv("CYPHER_TIMEOUT", "10"))
+CYPHER_MAX_ROWS = int(os.getenv("CYPHER_MAX_ROWS", "200"))
+CYPHER_FETCH_SIZE = int(os.getenv("CYPHER_FETCH_SIZE", "100"))
+# Refuse plans whose estimated row count exceeds this (0 disables the EXPLAIN pre-check).
+CYPHER_MAX_ESTIMATED_ROWS = int(os.getenv("CYPHER_MAX_ESTIMATED_ROWS", "0"))
+
+# Driver pool settings (neo4j defaults: 100 connections, 1h lifetime, 60s acquisition).
+NEO4J_MAX_POOL_SIZE = int(os.getenv("NEO4J_MAX_POOL_SIZE", "100"))
+NEO4J_MAX_CONNECTION_LIFETIME = float(os.getenv("NEO4J_MAX_CONNECTION_LIFETIME", "3600"))
+NEO4J_CONNECTION_ACQUISITION_TIMEOUT = float(os.getenv("NEO4J_CONNECTION_ACQUISITION_TIMEOUT", "60"))
+# Connections opened at startup so the first requests do not pay for the handshakes.
+NEO4J_WARM_CONNECTIONS = int(os.getenv("NEO4J_WARM_CONNECTIONS", "4"))
+
+_STRING_OR_COMMENT = re.compile(r"'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"|`[^`]*`|//[^\n]*|/\*.*?\*/", re.S)
+_WRITE_CLAUSE = re.compile(r"\b(CREATE|MERGE|DELETE|DETACH|SET|REMOVE|DROP|FOREACH|LOAD\s+CSV)\b", re.I)
+_UNIQUE_CONSTRAINT = re.compile(r"FOR \((\w+):(\w+)\) REQUIRE \1\.(\w+) IS UNIQUE")
+_LOWER_EQUALS = re.compile(r"toLower\((\w+)\.(\w+)\)\s*=\s*'([^'\\]*)'", re.I)
+_MATCH_WHERE_CONTAINS = re.compile(
+    r"(?P<optional>\bOPTIONAL\s+)?\bMATCH\s*\((\w+):(\w+)\)\s+WHERE\s+toLower\(\2\.(\w+)\)\s+CONTAINS\s+'([^'\\]*)'",
+    re.I,
+)
+_NEXT_CLAUSE = re.compile(r"\b(?:RETURN|WITH|MATCH|OPTIONAL|UNWIND|CALL|ORDER|LIMIT|UNION)\b", re.I)
+_BOOLEAN_OPERATOR = re.compile(r"\b(?:OR|XOR|NOT)\b", re.I)
+_TRAILING_LIMIT = re.compile(r"\bLIMIT\s+(\d+|\$\w+)\s*$", re.I)
+
+
+class UnsafeQueryError(ValueError):
+    """Raised when read_query() refuses to run a query."""
+
+
+def with_normalized(props: dict) -> dict:
+    """Adds the lowercased copies declared in NORMALIZED_PROPERTIES to a property map."""
+    props = dict(props)
+    for prop, normalized in NORMALIZED_PROPERTIES.items():
+        if isinstance(props.get(prop), str):
+            props[normalized] = props[prop].lower()
+    return props
+
+
+def rewrite_for_indexes(query: str) -> str:
+    """Rewrites the case-insensitive lookups the LLM generates into indexed ones.
+
+    - `toLower(x.name) = 'lit'` becomes `x.name_lower = 'lit'` (range index).
+    - `MATCH (x:Label) WHERE toLower(x.prop) CONTAINS 'lit' ...` over a full-text property
+      becomes a `db.index.fulltext.queryNodes` call; the original predicate is kept as a
+      filter so results are unchanged. Skipped for OPTIONAL MATCH and when the WHERE uses
+      OR/NOT.
+    """
+    def equality(match):
+        literal = match.group(3)
+        if match.group(2) not in NORMALIZED_PROPERTIES or literal != literal.lower():
+            return match.group(0)
+        return f"{match.group(1)}.{NORMALIZED_PROPERTIES[match.group(2)]} = '{literal}'"
+
+    query = _LOWER_EQUALS.sub(equality, query)
+
+    def contains(match):
+        _optional, var, label, prop, literal = match.groups()
+        rest = query[match.end():]
+        where_body = _NEXT_CLAUSE.split(rest, maxsplit=1)[0]
+        tokens = re.findall(r"[a-z0-9]+", literal)
+        # OPTIONAL MATCH must keep yielding a null row when nothing matches; a CALL cannot.
+        if (match.group("optional") or label not in ENTITY_LABELS or prop not in FULLTEXT_PROPERTIES or not tokens
+                or literal != literal.lower() or _BOOLEAN_OPERATOR.search(where_body)):
+            return match.group(0)
+        lucene = " AND ".join(f"{prop}:*{t}*" for t in tokens)
+        return (
+            f"CALL db.index.fulltext.queryNodes('{FULLTEXT_INDEX}', '{lucene}') YIELD node AS {var} "
+            f"WHERE {var}:{label} AND toLower({var}.{prop}) CONTAINS '{literal}'"
+        )
+
+    return _MATCH_WHERE_CONTAINS.sub(contains, query)
+
+
+def unique_keys() -> dict:
+    """Label -> key property, as declared by the uniqueness constraints in SCHEMA_QUERIES."""
+    keys = {}
+    for q in SCHEMA_QUERIES:
+        match = _UNIQUE_CONSTRAINT.search(q)
+        if match:
+            keys[match.group(2)] = match.group(3)
+    return keys
+
+
+def is_write_query(query: str) -> bool:
+    """True when the Cypher contains a write clause outside string literals and comments."""
+    return bool(_WRITE_CLAUSE.search(_STRING_OR_COMMENT.sub(" ", query)))
+
+
+def guard_read_query(query: str, max_rows: int) -> str:
+    """Rejects write clauses and appends a LIMIT when the query does not end with one.
+
+    Trailing semicolons and comments are dropped first, so `... LIMIT 5 // top five` keeps
+    its own LIMIT and an appended one does not end up commented out.
+    """
+    masked = _STRING_OR_COMMENT.sub(_blank_comment, query)
+    query = query[:len(masked.rstrip(" \t\r\n;"))].strip()
+    if is_write_query(query):
+        raise UnsafeQueryError("Write clauses are not allowed in generated queries.")
+    if not _TRAILING_LIMIT.search(query):
+        query = f"{query}\nLIMIT {max_rows}"
+    return query
+
+
+def _blank_comment(match) -> str:
+    """Comments become spaces of the same length; string literals and names are kept."""
+    text = match.group(0)
+    return " " * len(text) if text.startswith(("//", "/*")) else text
+
+
+def estimated_rows(plan) -> float:
+    """Estimated row count at the root of an EXPLAIN plan (0 when the planner gives none)."""
+    if not plan:
+        return 0.0
+    return float(plan.get("args", {}).get("EstimatedRows", 0))
+
+
+def result_cache_from_env():
+    """Builds the optional read-through result cache (NEO4J_RESULT_CACHE=1)."""
+    if os.getenv("NEO4J_RESULT_CACHE", "0") != "1":
+        return None
+    return make_cache(
+        "neo4j_results",
+        maxsize=int(os.getenv("NEO4J_RESULT_CACHE_SIZE", "1024")),
+        ttl=float(os.getenv("NEO4J_RESULT_CACHE_TTL", "0")) or None,
+        max_bytes=int(os.getenv("NEO4J_RESULT_CACHE_BYTES", str(32 * 1024 * 1024))),
+    )
+
+
 class Neo4jGraph:
-    def __init__(self):
+    def __init__(self, cache=None):
         self.uri = os.getenv("NEO4J_URI", "bolt://localhost:7687")
         self.username = os.getenv("NEO4J_USERNAME", "neo4j")
         self.password = os.getenv("NEO4J_PASSWORD", "password")
         self.driver = None
+        # Optional read-through cache keyed on (graph version, query, parameters).
+        self.cache = cache
+        self.version = None
+        self.version_check_interval = float(os.getenv("GRAPH_VERSION_CHECK_INTERVAL", "5"))
+        self._version_checked = 0.0
+
+    def driver_config(self) -> dict:
+        return {
+            "max_connection_pool_size": NEO4J_MAX_POOL_SIZE,
+            "max_connection_lifetime": NEO4J_MAX_CONNECTION_LIFETIME,
+            "connection_acquisition_timeout": NEO4J_CONNECTION_ACQUISITION_TIMEOUT,
+        }
 
     def connect(self):
         if not self.driver:
-            self.driver = GraphDatabase.driver(self.uri, auth=(self.username, self.password))
+            self.driver = GraphDatabase.driver(self.uri, auth=(self.username, self.password), **self.driver_config())
 
     def close(self):
         if self.driver:
             self.driver.close()
+            self.driver = None
 
-    def query(self, query, parameters=None):
+    def _run(self, query, parameters=None):
         self.connect()
-        with self.driver.session() as session:
+        with timed("neo4j", NEO4J_SECONDS, operation="query"), self.driver.session() as session:
             result = session.run(query, parameters or {})
-            return [record.data() for record in result]
+            rows = [record.data() for record in result]
+        NEO4J_ROWS.observe(len(rows), operation="query")
+        return rows
+
+    def query(self, query, parameters=None, bump_version=True):
+        """Runs a query. Writes bump the graph version; reads may be served from the cache.
+
+        Bulk writers can pass bump_version=False and call bump_version() once at the end.
+        """
+        if is_write_query(query):
+            rows = self._run(query, parameters)
+            if bump_version:
+                self.bump_version()
+            return rows
+        if self.cache is None:
+            return self._run(query, parameters)
+        key = self._cache_key(self.current_version(), query, parameters)
+        rows = self.cache.get(key)
+        if rows is None:
+            rows = self._run(query, parameters)
+            self.cache.set(key, rows)
+        return [dict(row) for row in rows]
+
+    def read_query(self, query, parameters=None, timeout=None, max_rows=None,
+                   fetch_size=None, max_estimated_rows=None):
+        """Guarded read path for untrusted (LLM-generated) Cypher.
+
+        Runs in a read transaction with a server-side timeout, refuses write clauses, caps
+        the result at `max_rows` (injecting a LIMIT when missing) and pulls records
+        `fetch_size` at a time, stopping once the cap is reached. With
+        `max_estimated_rows`, an EXPLAIN is run first and oversized plans are refused.
+        """
+        max_rows = max_rows or CYPHER_MAX_ROWS
+        query = guard_read_query(query, max_rows)
+        if self.cache is None:
+            return self._run_read(query, parameters, timeout, max_rows, fetch_size, max_estimated_rows)
+        key = self._cache_key(self.current_version(), query, parameters) + (max_rows,)
+        rows = self.cache.get(key)
+        if rows is None:
+            rows = self._run_read(query, parameters, timeout, max_rows, fetch_size, max_estimated_rows)
+            self.cache.set(key, rows)
+        return [dict(row) for row in rows]
+
+    def _run_read(self, query, parameters, timeout, max_rows, fetch_size, max_estimated_rows):
+        max_estimated_rows = CYPHER_MAX_ESTIMATED_ROWS if max_estimated_rows is None else max_estimated_rows
+
+        @unit_of_work(timeout=timeout or CYPHER_TIMEOUT)
+        def fetch(tx):
+            if max_estimated_rows:
+                plan = tx.run(f"EXPLAIN {query}", parameters or {}).consume().plan
+                if estimated_rows(plan) > max_estimated_rows:
+                    raise UnsafeQueryError(f"Query plan estimates {estimated_rows(plan):.0f} rows (limit {max_estimated_rows}).")
+            rows = []
+            for record in tx.run(query, parameters or {}):
+                rows.append(record.data())
+                if len(rows) >= max_rows:
+                    break
+            return rows
+
+        self.connect()
+        with timed("neo4j", NEO4J_SECONDS, operation="read"), \
+                self.driver.session(default_access_mode=READ_ACCESS, fetch_size=fetch_size or CYPHER_FETCH_SIZE) as session:
+            rows = session.execute_read(fetch)
+        NEO4J_ROWS.observe(len(rows), operation="read")
+        return rows
+
+    def current_version(self):
+        """Graph version, re-read from Neo4j at most every `version_check_interval` seconds."""
+        if time.monotonic() - self._version_checked > self.version_check_interval:
+            rows = self._run(GRAPH_VERSION_QUERY)
+            self._set_version(rows[0]["value"] if rows else None)
+        return self.version
+
+    def bump_version(self):
+        self._set_version(self._run(BUMP_VERSION_QUERY)[0]["value"])
+        return self.version
+
+    def _set_version(self, version):
+        # Keys carry the version, so a shared cache (other workers may already be filling it
+        # for the new version) is left to evict the old entries itself.
+        if version != self.version and self.cache is not None and not self.cache.shared:
+            self.cache.clear()
+        self.version = version
+        self._version_checked = time.monotonic()
+
+    @staticmethod
+    def _cache_key(version, query, parameters):
+        return (version, query, json.dumps(parameters or {}, sort_keys=True, default=str))
 
     def init_schema(self):
-        # Create constraints to ensure uniqueness
-        queries = [
-            "CREATE CONSTRAINT IF NOT EXISTS FOR (m:Member) REQUIRE m.id IS UNIQUE",
-            "CREATE CONSTRAINT IF NOT EXISTS FOR (d:Department) REQUIRE d.name IS UNIQUE",
-            "CREATE CONSTRAINT IF NOT EXISTS FOR (e:Event) REQUIRE e.name IS UNIQUE",
-            "CREATE CONSTRAINT IF NOT EXISTS FOR (p:Project) REQUIRE p.name IS UNIQUE",
-            "CREATE CONSTRAINT IF NOT EXISTS FOR (p:Partner) REQUIRE p.name IS UNIQUE"
-        ]
-        for q in queries:
-            self.query(q)
+        """Creates constraints and indexes and backfills normalized copies.
+
+        None of it changes what a query answers, so the graph version is left alone; data
+        loaders bump it themselves when they change something.
+        """
+        for q in SCHEMA_QUERIES + NORMALIZE_QUERIES:
+            self.query(q, bump_version=False)
+
+class AsyncNeo4jGraph(Neo4jGraph):
+    """Non-blocking variant of Neo4jGraph used on the request path."""
+
+    def connect(self):
+        if not self.driver:
+            self.driver = AsyncGraphDatabase.driver(self.uri, auth=(self.username, self.password), **self.driver_config())
+
+    async def warm_up(self, connections=None):
+        """Creates the driver, verifies connectivity and opens `connections` pooled connections."""
+        self.connect()
+        await self.driver.verify_connectivity()
+
+        async def ping():
+            async with self.driver.session() as session:
+                await (await session.run("RETURN 1")).consume()
+
+        await asyncio.gather(*(ping() for _ in range(connections or NEO4J_WARM_CONNECTIONS)))
+        await self.current_version()
+
+    async def close(self):
+        if self.driver:
+            await self.driver.close()
+            self.driver = None
+
+    async def _run(self, query, parameters=None):
+        self.connect()
+        with timed("neo4j", NEO4J_SECONDS, operation="query"):
+            async with self.driver.session() as session:
+                result = await session.run(query, parameters or {})
+                rows = [record.data() async for record in result]
+        NEO4J_ROWS.observe(len(rows), operation="query")
+        return rows
+
+    async def query(self, query, parameters=None, bump_version=True):
+        if is_write_query(query):
+            rows = await self._run(query, parameters)
+            if bump_version:
+                await self.bump_version()
+            return rows
+        if self.cache is None:
+            return await self._run(query, parameters)
+        key = self._cache_key(await self.current_version(), query, parameters)
+        rows = await self.cache.aget(key)
+        if rows is None:
+            rows = await self._run(query, parameters)
+            await self.cache.aset(key, rows)
+        return [dict(row) for row in rows]
+
+    async def read_query(self, query, parameters=None, timeout=None, max_rows=None,
+                         fetch_size=None, max_estimated_rows=None):
+        max_rows = max_rows or CYPHER_MAX_ROWS
+        query = guard_read_query(query, max_rows)
+        if self.cache is None:
+            return await self._run_read(query, parameters, timeout, max_rows, fetch_size, max_estimated_rows)
+        key = self._cache_key(await self.current_version(), query, parameters) + (max_rows,)
+        rows = await self.cache.aget(key)
+        if rows is None:
+            rows = await self._run_read(query, parameters, timeout, max_rows, fetch_size, max_estimated_rows)
+            await self.cache.aset(key, rows)
+        return [dict(row) for row in rows]
+
+    async def _run_read(self, query, parameters, timeout, max_rows, fetch_size, max_estimated_rows):
+        max_estimated_rows = CYPHER_MAX_ESTIMATED_ROWS if max_estimated_rows is None else max_estimated_rows
+
+        @unit_of_work(timeout=timeout or CYPHER_TIMEOUT)
+        async def fetch(tx):
+            if max_estimated_rows:
+                plan = (await (await tx.run(f"EXPLAIN {query}", parameters or {})).consume()).plan
+                if estimated_rows(plan) > max_estimated_rows:
+                    raise UnsafeQueryError(f"Query plan estimates {estimated_rows(plan):.0f} rows (limit {max_estimated_rows}).")
+            rows = []
+            async for record in await tx.run(query, parameters or {}):
+                rows.append(record.data())
+                if len(rows) >= max_rows:
+                    break
+            return rows
+
+        self.connect()
+        with timed("neo4j", NEO4J_SECONDS, operation="read"):
+            async with self.driver.session(default_access_mode=READ_ACCESS, fetch_size=fetch_size or CYPHER_FETCH_SIZE) as session:
+                rows = await session.execute_read(fetch)
+        NEO4J_ROWS.observe(len(rows), operation="read")
+        return rows
+
+    async def current_version(self):
+        if time.monotonic() - self._version_checked > self.version_check_interval:
+            rows = await self._run(GRAPH_VERSION_QUERY)
+            self._set_version(rows[0]["value"] if rows else None)
+        return self.version
+
+    async def bump_version(self):
+        self._set_version((await self._run(BUMP_VERSION_QUERY))[0]["value"])
+        return self.version
+
+    async def init_schema(self):
+        for q in SCHEMA_QUERIES + NORMALIZE_QUERIES:
+            await self.query(q, bump_version=False)
 
 graph_db = Neo4jGraph()
+async_graph_db = AsyncNeo4jGraph(cache=result_cache_from_env())
+register_cache("neo4j_results", async_graph_db.cache)
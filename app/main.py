@@ -1,9 +1,54 @@
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
-from app.agents import agent_app
+import asyncio
+import json
+import math
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import List, Optional
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from pydantic import BaseModel, Field
+from starlette.background import BackgroundTask
+from app.admission import Overloaded, admission
+from app.agents import BATCH_TIMEOUT, agent_app, answer_key, answer_question, ask_many, cached_answer, shutdown, warm_up
+from app.cache import answer_cache
+from app.deadline import DeadlineExceeded, deadline_after
+from app.metrics import REQUEST_SECONDS, registry, server_timing, start_trace
 import uvicorn
 
-app = FastAPI(title="Agentic AI Knowledge Graph API")
+# Seconds between warm-up attempts while Neo4j or the LLM is unreachable at startup.
+WARMUP_RETRY_INTERVAL = float(os.getenv("WARMUP_RETRY_INTERVAL", "5"))
+
+async def warm_up_until_ready(app: FastAPI):
+    """Retries warm-up until it succeeds, then marks the instance ready."""
+    while True:
+        started = time.perf_counter()
+        try:
+            await warm_up()
+        except Exception as e:
+            app.state.warmup_error = str(e)
+            print(f"Warm-up failed, retrying in {WARMUP_RETRY_INTERVAL}s: {e}")
+            await asyncio.sleep(WARMUP_RETRY_INTERVAL)
+            continue
+        app.state.warmup_error = None
+        app.state.ready = True
+        print(f"Warm-up complete in {time.perf_counter() - started:.2f}s")
+        return
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # The workflow is compiled when app.agents is imported, before this runs. Warm-up runs in
+    # the background so the process answers liveness checks; /ready reports when it is done.
+    app.state.ready = False
+    app.state.warmup_error = None
+    warmup = asyncio.create_task(warm_up_until_ready(app))
+    try:
+        yield
+    finally:
+        warmup.cancel()
+        await shutdown()
+
+app = FastAPI(title="Agentic AI Knowledge Graph API", lifespan=lifespan)
 
 class QuestionRequest(BaseModel):
     question: str
@@ -11,25 +56,173 @@ class QuestionRequest(BaseModel):
 class AnswerResponse(BaseModel):
     answer: str
     classification: str
-    context: str = None
+    context: Optional[str] = None
+
+class BatchRequest(BaseModel):
+    questions: List[str] = Field(..., max_length=1000)
+    concurrency: Optional[int] = Field(None, ge=1, le=64)
+
+class BatchItem(BaseModel):
+    question: str
+    answer: Optional[str] = None
+    classification: Optional[str] = None
+    context: Optional[str] = None
+    error: Optional[str] = None
+
+class BatchResponse(BaseModel):
+    results: List[BatchItem]
+
+@app.middleware("http")
+async def record_timing(request: Request, call_next):
+    """Times each request and reports its spans (nodes, LLM calls, Neo4j) in Server-Timing.
+
+    Streaming responses send headers before the body runs, so they only carry the total
+    up to the first byte.
+    """
+    trace = start_trace()
+    started = time.perf_counter()
+    response = await call_next(request)
+    elapsed = time.perf_counter() - started
+    REQUEST_SECONDS.observe(elapsed, path=request.url.path, status=response.status_code)
+    response.headers["Server-Timing"] = server_timing(trace, total=elapsed)
+    return response
+
+@app.exception_handler(Overloaded)
+async def overloaded(request: Request, exc: Overloaded):
+    return JSONResponse(status_code=503, content={"detail": str(exc)},
+                        headers={"Retry-After": str(exc.retry_after)})
+
+@app.exception_handler(DeadlineExceeded)
+async def deadline_exceeded(request: Request, exc: DeadlineExceeded):
+    return JSONResponse(status_code=504, content={"detail": str(exc)})
+
+def request_timeout(request: Request):
+    """The client's X-Request-Timeout in seconds, or None for REQUEST_TIMEOUT.
+
+    Values that are not a positive, finite number of seconds (nan, inf, 0, -1) are ignored.
+    """
+    try:
+        seconds = float(request.headers["x-request-timeout"])
+    except (KeyError, ValueError):
+        return None
+    return seconds if math.isfinite(seconds) and seconds > 0 else None
+
+def request_deadline(request: Request) -> float:
+    """REQUEST_TIMEOUT from now, or sooner if the client sends X-Request-Timeout (seconds)."""
+    return deadline_after(request_timeout(request))
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
 
 @app.get("/")
 def read_root():
     return {"status": "ok", "message": "Agentic AI is running. POST to /ask"}
 
+@app.get("/ready")
+def ready():
+    """Readiness probe: 503 until the driver pool, entity index and LLM client are warm."""
+    if getattr(app.state, "ready", False):
+        return {"ready": True}
+    return JSONResponse(status_code=503, content={"ready": False, "error": getattr(app.state, "warmup_error", None)})
+
 @app.post("/ask", response_model=AnswerResponse)
-def ask_question(request: QuestionRequest):
+async def ask_question(request: QuestionRequest, http_request: Request):
+    deadline = request_deadline(http_request)
     try:
-        # Invoke the LangGraph agent
-        result = agent_app.invoke({"question": request.question})
+        # Invoke the LangGraph agent (identical in-flight questions are shared). Cached
+        # answers skip admission; everything else waits for a slot or gets a 503.
+        result = await answer_question(request.question, deadline, admission=admission)
         
         return AnswerResponse(
             answer=result.get("answer", "No answer generated."),
             classification=result.get("classification", "unknown"),
             context=result.get("context", None)
         )
+    except (Overloaded, DeadlineExceeded):
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/ask/batch", response_model=BatchResponse)
+async def ask_batch(request: BatchRequest, http_request: Request):
+    # A batch takes one admission slot; its own concurrency limit bounds the work inside.
+    # X-Request-Timeout applies to each question from when it starts, not to the batch.
+    ticket = await admission.acquire(request_deadline(http_request))
+    try:
+        results = await ask_many(
+            request.questions, concurrency=request.concurrency, timeout=request_timeout(http_request),
+            deadline=time.monotonic() + BATCH_TIMEOUT if BATCH_TIMEOUT else None,
+        )
+    finally:
+        ticket.release()
+    return BatchResponse(results=[
+        BatchItem(
+            question=r["question"],
+            answer=r.get("answer"),
+            classification=r.get("classification"),
+            context=r.get("context"),
+            error=r.get("error"),
+        )
+        for r in results
+    ])
+
+def sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+def done_event(result: dict) -> str:
+    return sse("done", {
+        "answer": result.get("answer", "No answer generated."),
+        "classification": result.get("classification", "unknown"),
+        "context": result.get("context"),
+    })
+
+async def stream_answer(question: str, deadline=None, ticket=None):
+    """Relays classification, Cypher and answer tokens as they are produced."""
+    final = {}
+    try:
+        key = await answer_key(question)
+        cached = await cached_answer(key)
+        if cached is not None:
+            yield sse("token", {"text": cached.get("answer", "")})
+            yield done_event(cached)
+            return
+
+        async for mode, chunk in agent_app.astream(
+            {"question": question, "deadline": deadline}, stream_mode=["custom", "messages", "updates"]
+        ):
+            if mode == "custom":
+                payload = dict(chunk)
+                yield sse(payload.pop("event"), payload)
+            elif mode == "messages":
+                message, _metadata = chunk
+                if message.content:
+                    yield sse("token", {"text": message.content})
+            else:
+                for update in chunk.values():
+                    final.update(update or {})
+        if key is not None and final.get("answer") and not final.get("failed"):
+            await answer_cache.aset(key, {"question": question, **final})
+        yield done_event(final)
+    except Exception as e:
+        yield sse("error", {"detail": str(e)})
+    finally:
+        if ticket:
+            ticket.release()
+
+@app.post("/ask/stream")
+async def ask_question_stream(request: QuestionRequest, http_request: Request):
+    # Admitted before the response starts, so saturation is still a 503 and not a stream error.
+    # The slot is released when the stream ends, or by the background task if it never starts.
+    deadline = request_deadline(http_request)
+    ticket = await admission.acquire(deadline)
+    return StreamingResponse(
+        stream_answer(request.question, deadline, ticket),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        background=BackgroundTask(ticket.release),
+    )
+
 if __name__ == "__main__":
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    # Several workers share cached work only with CACHE_BACKEND=sqlite.
+    uvicorn.run("app.main:app", host="0.0.0.0", port=8000, workers=int(os.getenv("WEB_CONCURRENCY", "1")))
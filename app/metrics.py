@@ -0,0 +1,226 @@
+import contextvars
+import functools
+import threading
+import time
+from contextlib import contextmanager
+
+# Latency buckets in seconds, spanning cached Neo4j reads to slow LLM answers.
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+COUNT_BUCKETS = (0, 1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+def _labels(names, values, extra=()):
+    pairs = [*zip(names, values), *extra]
+    if not pairs:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _n, v in pairs)
+    return "{" + ",".join(f'{n}="{v}"' for (n, _v), v in zip(pairs, escaped)) + "}"
+
+
+def _number(value) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name, help, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(labels[n] for n in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def get(self, **labels):
+        with self._lock:
+            return self._values.get(tuple(labels[n] for n in self.labelnames), 0)
+
+    def keys(self):
+        with self._lock:
+            return list(self._values)
+
+    def render(self):
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} counter"
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                yield f"{self.name}{_labels(self.labelnames, key)} {_number(value)}"
+
+
+class Histogram:
+    def __init__(self, name, help, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets) + (float("inf"),)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(labels[n] for n in self.labelnames)
+        with self._lock:
+            counts, total = self._values.get(key, ([0] * len(self.buckets), 0.0))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            self._values[key] = (counts, total + value)
+
+    def render(self):
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} histogram"
+        with self._lock:
+            for key, (counts, total) in sorted(self._values.items()):
+                for bound, count in zip(self.buckets, counts):
+                    yield f"{self.name}_bucket{_labels(self.labelnames, key, [('le', _number(bound))])} {count}"
+                yield f"{self.name}_sum{_labels(self.labelnames, key)} {_number(total)}"
+                yield f"{self.name}_count{_labels(self.labelnames, key)} {counts[-1]}"
+
+
+class CallbackGauge:
+    """Gauge read at scrape time; `callback` returns {label values tuple: value}."""
+
+    def __init__(self, name, help, labelnames, callback):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.callback = callback
+
+    def render(self):
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} gauge"
+        for key, value in sorted(self.callback().items()):
+            yield f"{self.name}{_labels(self.labelnames, key)} {_number(value)}"
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)."""
+        return "\n".join(line for metric in self.metrics for line in metric.render()) + "\n"
+
+
+registry = Registry()
+
+REQUEST_SECONDS = registry.register(Histogram(
+    "agent_request_seconds", "HTTP request latency.", ["path", "status"]))
+NODE_SECONDS = registry.register(Histogram(
+    "agent_node_seconds", "LangGraph node latency.", ["node"]))
+LLM_SECONDS = registry.register(Histogram(
+    "agent_llm_seconds", "LLM call latency per call site.", ["site"]))
+LLM_TOKENS = registry.register(Counter(
+    "agent_llm_tokens_total", "LLM tokens per call site (prompt, completion, and cached prompt tokens).",
+    ["site", "kind"]))
+LLM_PROMPT_CACHE = registry.register(Counter(
+    "agent_llm_prompt_cache_total", "LLM calls whose prompt prefix was served from the provider's cache.",
+    ["site", "result"]))
+NEO4J_SECONDS = registry.register(Histogram(
+    "agent_neo4j_query_seconds", "Neo4j round-trip latency (cache misses only).", ["operation"]))
+NEO4J_ROWS = registry.register(Histogram(
+    "agent_neo4j_rows", "Rows returned per Neo4j query.", ["operation"], buckets=COUNT_BUCKETS))
+CLASSIFICATIONS = registry.register(Counter(
+    "agent_classifications_total", "Routed questions by classification and deciding source.",
+    ["classification", "source"]))
+CYPHER_SOURCES = registry.register(Counter(
+    "agent_cypher_source_total", "Where executed Cypher came from (template, cache, llm).", ["source"]))
+CYPHER_VALIDATIONS = registry.register(Counter(
+    "agent_cypher_validation_total", "Generated Cypher that was valid, valid after one repair, or rejected.",
+    ["result"]))
+ANSWER_SOURCES = registry.register(Counter(
+    "agent_answer_source_total", "How graph answers were phrased (template or llm), or invalid when the Cypher was rejected.", ["source"]))
+ASK_RESULTS = registry.register(Counter(
+    "agent_ask_total", "Questions answered from the answer cache, by joining an in-flight run, or by running.",
+    ["result"]))
+DEADLINES_EXCEEDED = registry.register(Counter(
+    "agent_deadline_exceeded_total", "Requests whose time budget ran out, by the stage that was cut.", ["stage"]))
+ADMISSIONS = registry.register(Counter(
+    "agent_admission_total", "Requests admitted at once, after queueing, or rejected with 503.", ["result"]))
+SNAPSHOT_QUERIES = registry.register(Counter(
+    "agent_snapshot_queries_total", "Reads answered by the in-memory snapshot or passed to Neo4j.", ["result"]))
+
+
+def _prompt_cache_hit_rate():
+    sites = {key[0] for key in LLM_PROMPT_CACHE.keys()}
+    rates = {}
+    for site in sites:
+        prompt = LLM_TOKENS.get(site=site, kind="prompt")
+        rates[(site,)] = LLM_TOKENS.get(site=site, kind="cached") / prompt if prompt else 0.0
+    return rates
+
+
+registry.register(CallbackGauge(
+    "agent_llm_prompt_cache_hit_rate", "Share of prompt tokens read from the provider's prompt cache.",
+    ["site"], _prompt_cache_hit_rate))
+
+_caches = {}
+
+
+def register_cache(name, cache):
+    """Exposes a cache's stats() (hits, misses, hit rate, size) under `name`."""
+    if cache is not None:
+        _caches[name] = cache
+
+
+def _cache_stat(field):
+    return lambda: {(name,): cache.stats()[field] for name, cache in _caches.items()}
+
+
+for _field, _help in [("hits", "Cache hits."), ("misses", "Cache misses."),
+                      ("hit_rate", "Cache hit rate since start."), ("size", "Cached entries.")]:
+    registry.register(CallbackGauge(f"agent_cache_{_field}", _help, ["cache"], _cache_stat(_field)))
+
+
+# --- Request-scoped trace ---
+
+# Spans recorded during the current request as [(name, seconds)]; None outside requests.
+current_trace = contextvars.ContextVar("current_trace", default=None)
+
+
+def start_trace():
+    trace = []
+    current_trace.set(trace)
+    return trace
+
+
+@contextmanager
+def timed(span, histogram=None, **labels):
+    """Times the block into `histogram` and, inside a request, the trace as `span`."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        if histogram is not None:
+            histogram.observe(elapsed, **labels)
+        trace = current_trace.get()
+        if trace is not None:
+            trace.append((span, elapsed))
+
+
+def timed_node(name, node):
+    """Wraps an async LangGraph node so its latency lands in NODE_SECONDS and the trace."""
+    @functools.wraps(node)
+    async def wrapper(state):
+        with timed(name, NODE_SECONDS, node=name):
+            return await node(state)
+    return wrapper
+
+
+def server_timing(trace, total=None) -> str:
+    """`Server-Timing` header value; repeated spans are summed, in first-seen order."""
+    durations = {}
+    for span, seconds in trace:
+        durations[span] = durations.get(span, 0.0) + seconds
+    if total is not None:
+        durations["total"] = total
+    return ", ".join(f"{span};dur={seconds * 1000:.1f}" for span, seconds in durations.items())
@@ -0,0 +1,127 @@
+import asyncio
+from dataclasses import dataclass, field
+
+from app.graph import NORMALIZED_PROPERTIES
+from app.specs import NODE_SPECS, RELATIONSHIP_SPECS
+
+# Read once from the live graph at startup; the seed specs stand in when introspection fails.
+LABELS_QUERY = "CALL db.labels() YIELD label RETURN label"
+RELATIONSHIP_TYPES_QUERY = "CALL db.relationshipTypes() YIELD relationshipType RETURN relationshipType AS type"
+NODE_PROPERTIES_QUERY = """
+CALL db.schema.nodeTypeProperties() YIELD nodeLabels, propertyName
+RETURN nodeLabels AS labels, propertyName AS property
+"""
+RELATIONSHIP_PROPERTIES_QUERY = """
+CALL db.schema.relTypeProperties() YIELD relType, propertyName
+RETURN relType AS type, propertyName AS property
+"""
+# db.schema.visualization() comes from the count store, so it does not scan relationships.
+PATTERNS_QUERY = """
+CALL db.schema.visualization() YIELD relationships
+UNWIND relationships AS r
+RETURN DISTINCT startNode(r).name AS source, type(r) AS type, endNode(r).name AS target
+"""
+
+# Bookkeeping the LLM should not see or query.
+INTERNAL_LABELS = {"GraphVersion"}
+INTERNAL_PROPERTIES = set(NORMALIZED_PROPERTIES.values())
+# Valid, but left out of the prompt text (provenance links).
+UNPROMPTED_PROPERTIES = {"source"}
+
+
+@dataclass
+class GraphSchema:
+    nodes: dict = field(default_factory=dict)  # label -> sorted property names
+    relationships: dict = field(default_factory=dict)  # type -> sorted property names
+    patterns: list = field(default_factory=list)  # sorted (source label, type, target label)
+    source: str = "specs"  # "introspection" or "specs"
+
+    @classmethod
+    def from_specs(cls):
+        """The schema the seed data produces (app/specs.py)."""
+        relationships = {}
+        for (_source, rel_type, _target), spec in RELATIONSHIP_SPECS.items():
+            relationships.setdefault(rel_type, set()).update(spec[3])
+        return cls(
+            nodes={label: sorted(properties) for label, (_dataset, properties) in sorted(NODE_SPECS.items())},
+            relationships={rel_type: sorted(props) for rel_type, props in sorted(relationships.items())},
+            patterns=sorted(RELATIONSHIP_SPECS),
+        )
+
+    @classmethod
+    def from_introspection(cls, labels, types, node_properties, relationship_properties, patterns):
+        nodes = {row["label"]: set() for row in labels if row["label"] not in INTERNAL_LABELS}
+        for row in node_properties:
+            for label in row["labels"] or []:
+                if label in nodes and row["property"] and row["property"] not in INTERNAL_PROPERTIES:
+                    nodes[label].add(row["property"])
+        relationships = {row["type"]: set() for row in types}
+        for row in relationship_properties:
+            # relType comes back as ":`TYPE`".
+            rel_type = (row["type"] or "").lstrip(":").strip("`")
+            if rel_type in relationships and row["property"]:
+                relationships[rel_type].add(row["property"])
+        return cls(
+            nodes={label: sorted(props) for label, props in sorted(nodes.items())},
+            relationships={rel_type: sorted(props) for rel_type, props in sorted(relationships.items())},
+            patterns=sorted({
+                (row["source"], row["type"], row["target"]) for row in patterns
+                if row["source"] in nodes and row["target"] in nodes and row["type"] in relationships
+            }),
+            source="introspection",
+        )
+
+    def properties(self, label) -> list:
+        return self.nodes.get(label, [])
+
+    def render(self) -> str:
+        """Prompt text for the schema; the same schema always renders to the same bytes."""
+        lines = ["Nodes:"]
+        for label, props in self.nodes.items():
+            shown = [p for p in props if p not in UNPROMPTED_PROPERTIES]
+            lines.append(f"- {label} ({', '.join(shown)})")
+        lines.append("")
+        lines.append("Relationships:")
+        for source, rel_type, target in self.patterns:
+            props = self.relationships.get(rel_type) or []
+            details = f" {{{', '.join(props)}}}" if props else ""
+            lines.append(f"- (:{source})-[:{rel_type}{details}]->(:{target})")
+        return "\n".join(lines)
+
+
+class SchemaStore:
+    """The graph schema and its rendered prompt text, introspected once per process."""
+
+    def __init__(self):
+        self.schema = GraphSchema.from_specs()
+        self.text = self.schema.render()
+        self.loaded = False
+        self._lock = asyncio.Lock()
+
+    def set(self, schema):
+        self.schema = schema
+        self.text = schema.render()
+
+    async def ensure_loaded(self, graph, force=False):
+        """Introspects `graph` unless already done; on failure keeps the current (initially seed-spec) schema."""
+        if self.loaded and not force:
+            return self.schema
+        async with self._lock:
+            if self.loaded and not force:
+                return self.schema
+            try:
+                results = [await graph.query(q) for q in (
+                    LABELS_QUERY, RELATIONSHIP_TYPES_QUERY, NODE_PROPERTIES_QUERY,
+                    RELATIONSHIP_PROPERTIES_QUERY, PATTERNS_QUERY,
+                )]
+                schema = GraphSchema.from_introspection(*results)
+                if not schema.nodes:
+                    raise ValueError("the graph has no labels yet")
+                self.set(schema)
+            except Exception as e:
+                print(f"Schema: introspection failed, keeping the {self.schema.source} schema ({e})")
+            self.loaded = True
+        return self.schema
+
+
+graph_schema = SchemaStore()
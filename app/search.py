@@ -0,0 +1,216 @@
+import asyncio
+import math
+import os
+import re
+from collections import Counter
+from dataclasses import dataclass
+
+import numpy as np
+from dotenv import load_dotenv
+
+from app.cache import fold
+from app.classifier import ENTITY_LABELS, stem
+from app.graph import FULLTEXT_PROPERTIES, unique_keys
+
+load_dotenv()
+
+# A hit resolves a question on its own when it is the only hit named by every query term, or
+# when it matches every term, scores at least SEARCH_MIN_SCORE and SEARCH_MARGIN times the
+# runner-up; otherwise the top hits only ground Cypher generation, and only those named by
+# the query or scoring at least SEARCH_GROUND_MIN_SCORE (a single common word like "club"
+# scores below it).
+SEARCH_MIN_SCORE = float(os.getenv("SEARCH_MIN_SCORE", "2.0"))
+SEARCH_MARGIN = float(os.getenv("SEARCH_MARGIN", "1.5"))
+SEARCH_GROUND_MIN_SCORE = float(os.getenv("SEARCH_GROUND_MIN_SCORE", "2.5"))
+SEARCH_TOP_K = int(os.getenv("SEARCH_TOP_K", "3"))
+
+# Node text to index: the full-text properties plus each label's key.
+_SEARCH_PROPERTIES = list(dict.fromkeys(FULLTEXT_PROPERTIES + sorted(set(unique_keys().values()))))
+SEARCH_QUERY = f"""
+MATCH (n)
+WHERE {' OR '.join(f'n:{label}' for label in ENTITY_LABELS)}
+RETURN [l IN labels(n) WHERE l IN $labels][0] AS label, n {{{', '.join('.' + p for p in _SEARCH_PROPERTIES)}}} AS props
+"""
+
+# Question filler and the label names themselves ("the website project") carry no signal.
+STOPWORDS = {stem(w) for w in [
+    "a", "about", "an", "and", "are", "at", "by", "can", "describe", "details", "do", "does", "for",
+    "from", "how", "i", "in", "info", "information", "is", "it", "me", "of", "on", "or", "tell",
+    "that", "the", "this", "to", "was", "what", "when", "where", "which", "who", "with", "you",
+    *(label.lower() for label in ENTITY_LABELS),
+]}
+
+_WORD = re.compile(r"\w+")
+
+
+def tokenize(text: str):
+    """Folded, stemmed words without stopwords."""
+    return [t for t in (stem(w) for w in _WORD.findall(fold(text))) if t not in STOPWORDS]
+
+
+@dataclass(frozen=True)
+class SearchHit:
+    score: float
+    label: str
+    key: str
+    name: str
+    coverage: float  # share of the query terms found in the node's text
+    named: bool  # every query term occurs in the node's name
+
+
+class SearchIndex:
+    """BM25 index over node text, scored with NumPy.
+
+    Each node is one document: its name (counted twice, as a field boost) followed by its
+    other text properties. Postings are kept per term and turned into arrays lazily, so
+    sync() only touches the nodes whose text changed.
+    """
+
+    def __init__(self, k1=1.2, b=0.75):
+        self.k1 = k1
+        self.b = b
+        self.docs = []  # slot -> (label, key, name), None once removed
+        self.slots = {}  # (label, key) -> slot
+        self.texts = {}  # (label, key) -> indexed text
+        self.free = []
+        self.lengths = np.zeros(64, dtype=np.float32)
+        self.total_length = 0
+        self.postings = {}  # term -> {slot: term frequency}
+        self._arrays = {}  # term -> (slots, frequencies), dropped when the term's postings change
+        self.version = None
+        self._lock = asyncio.Lock()
+
+    def __len__(self):
+        return len(self.slots)
+
+    def upsert(self, label, key, name, text):
+        doc = (label, key)
+        if self.texts.get(doc) == text:
+            return
+        if doc in self.slots:
+            self.remove(label, key)
+        slot = self.free.pop() if self.free else len(self.docs)
+        if slot == len(self.docs):
+            self.docs.append(None)
+        if slot >= len(self.lengths):
+            self.lengths = np.concatenate([self.lengths, np.zeros(len(self.lengths), dtype=np.float32)])
+        terms = tokenize(text)
+        for term, count in Counter(terms).items():
+            self.postings.setdefault(term, {})[slot] = count
+            self._arrays.pop(term, None)
+        self.docs[slot] = (label, key, name)
+        self.slots[doc] = slot
+        self.texts[doc] = text
+        self.lengths[slot] = len(terms)
+        self.total_length += len(terms)
+
+    def remove(self, label, key):
+        doc = (label, key)
+        slot = self.slots.pop(doc, None)
+        if slot is None:
+            return
+        for term in set(tokenize(self.texts.pop(doc))):
+            postings = self.postings[term]
+            postings.pop(slot, None)
+            if not postings:
+                del self.postings[term]
+            self._arrays.pop(term, None)
+        self.total_length -= int(self.lengths[slot])
+        self.lengths[slot] = 0
+        self.docs[slot] = None
+        self.free.append(slot)
+
+    def sync(self, rows) -> dict:
+        """Brings the index in line with SEARCH_QUERY rows; returns upserted/removed counts."""
+        keys = unique_keys()
+        desired = {}
+        for row in rows:
+            label, props = row.get("label"), row.get("props") or {}
+            key = props.get(keys.get(label, "name"))
+            if label is None or key is None:
+                continue
+            name = props.get("name") or str(key)
+            parts = [name, name] + [str(props[p]) for p in _SEARCH_PROPERTIES if p != "name" and props.get(p) is not None]
+            desired[(label, key)] = (name, " \n".join(parts))
+
+        removed = [doc for doc in self.slots if doc not in desired]
+        for label, key in removed:
+            self.remove(label, key)
+        upserted = 0
+        for (label, key), (name, text) in desired.items():
+            if self.texts.get((label, key)) != text:
+                self.upsert(label, key, name, text)
+                upserted += 1
+        return {"upserted": upserted, "removed": len(removed), "documents": len(self.slots)}
+
+    async def ensure_current(self, graph):
+        """Re-syncs from the graph when its version changed; failures keep the old index."""
+        try:
+            version = await graph.current_version()
+            if self.version is not None and version == self.version:
+                return self
+            async with self._lock:
+                if self.version is None or version != self.version:
+                    self.sync(await graph.query(SEARCH_QUERY, {"labels": ENTITY_LABELS}))
+                    self.version = version
+        except Exception as e:
+            print(f"Search index: could not refresh ({e})")
+        return self
+
+    def _posting_arrays(self, term):
+        arrays = self._arrays.get(term)
+        if arrays is None:
+            postings = self.postings[term]
+            arrays = (np.fromiter(postings.keys(), dtype=np.int64, count=len(postings)),
+                      np.fromiter(postings.values(), dtype=np.float32, count=len(postings)))
+            self._arrays[term] = arrays
+        return arrays
+
+    def search(self, text: str, k=SEARCH_TOP_K, labels=None):
+        """Top `k` nodes for `text` by BM25 score, optionally restricted to `labels`."""
+        query = list(dict.fromkeys(tokenize(text)))
+        terms = [t for t in query if t in self.postings]
+        count = len(self.slots)
+        if not terms or not count:
+            return []
+        average = self.total_length / count
+        scores = np.zeros(len(self.docs), dtype=np.float32)
+        matched = np.zeros(len(self.docs), dtype=np.int32)
+        for term in terms:
+            slots, frequencies = self._posting_arrays(term)
+            idf = math.log(1 + (count - len(slots) + 0.5) / (len(slots) + 0.5))
+            norm = self.k1 * (1 - self.b + self.b * self.lengths[slots] / average)
+            scores[slots] += idf * frequencies * (self.k1 + 1) / (frequencies + norm)
+            matched[slots] += 1
+
+        candidates = np.flatnonzero(scores > 0)
+        if labels:
+            candidates = np.array([s for s in candidates if self.docs[s][0] in labels], dtype=np.int64)
+        if len(candidates) > k:
+            candidates = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+        ranked = candidates[np.argsort(-scores[candidates], kind="stable")]
+        return [
+            SearchHit(float(scores[s]), *self.docs[s], coverage=float(matched[s]) / len(query),
+                      named=set(query) <= set(tokenize(self.docs[s][2])))
+            for s in ranked
+        ]
+
+
+def confident_hit(hits):
+    """The hit that clearly answers the query, else None."""
+    named = [hit for hit in hits if hit.named]
+    if named:
+        return named[0] if len(named) == 1 else None
+    if not hits or hits[0].coverage < 1 or hits[0].score < SEARCH_MIN_SCORE:
+        return None
+    if len(hits) > 1 and hits[0].score < SEARCH_MARGIN * hits[1].score:
+        return None
+    return hits[0]
+
+
+def grounding_hits(hits):
+    """The hits strong enough to suggest to the LLM as the nodes a question is about."""
+    return [hit for hit in hits if hit.named or hit.score >= SEARCH_GROUND_MIN_SCORE]
+
+
+search_index = SearchIndex()
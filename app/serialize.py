@@ -0,0 +1,105 @@
+import csv
+import io
+import json
+import os
+from functools import lru_cache
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+RESULT_TOKEN_BUDGET = int(os.getenv("RESULT_TOKEN_BUDGET", "1500"))
+
+
+@lru_cache(maxsize=1)
+def _encoding():
+    try:
+        import tiktoken
+
+        return tiktoken.get_encoding("o200k_base")
+    except Exception:  # tiktoken missing or its encoding file cannot be fetched
+        return None
+
+
+def count_tokens(text: str) -> int:
+    """Token count for gpt-4o-family models; ~4 characters per token without tiktoken."""
+    encoding = _encoding()
+    if encoding is not None:
+        return len(encoding.encode(text))
+    return (len(text) + 3) // 4
+
+
+def _flatten(row: dict, prefix=""):
+    """Flattens nested maps (whole nodes returned by `RETURN e`) into dotted columns."""
+    flat = {}
+    for key, value in row.items():
+        if isinstance(value, dict):
+            flat.update(_flatten(value, f"{prefix}{key}."))
+        else:
+            flat[f"{prefix}{key}"] = value
+    return flat
+
+
+def _cell(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, (list, tuple)):
+        return "; ".join(_cell(v) for v in value)
+    if isinstance(value, (str, int, float, bool)):
+        return str(value)
+    return json.dumps(value, default=str)
+
+
+def _csv_line(values) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator="\n").writerow(values)
+    return buffer.getvalue()
+
+
+def serialize_results(results, token_budget=None):
+    """Renders query results as CSV for the answer prompt.
+
+    Column names are written once, duplicate rows are dropped and rows beyond
+    `token_budget` are replaced by an "... N more rows" marker. Returns (text, stats)
+    where stats compares the token count with the `str(results)` it replaces.
+    """
+    token_budget = token_budget or RESULT_TOKEN_BUDGET
+    rows = [_flatten(r) for r in results]
+    columns = list(dict.fromkeys(key for row in rows for key in row))
+
+    seen = set()
+    lines = []
+    for row in rows:
+        line = _csv_line([_cell(row.get(c)) for c in columns])
+        if line not in seen:
+            seen.add(line)
+            lines.append(line)
+
+    if not lines:
+        text = "(no rows)"
+        shown = 0
+    else:
+        text = _csv_line(columns)
+        tokens = count_tokens(text)
+        shown = 0
+        for line in lines:
+            line_tokens = count_tokens(line)
+            if shown and tokens + line_tokens > token_budget:
+                break
+            text += line
+            tokens += line_tokens
+            shown += 1
+        if shown < len(lines):
+            text += f"... {len(lines) - shown} more rows\n"
+        text = text.rstrip("\n")
+
+    tokens = count_tokens(text)
+    raw_tokens = count_tokens(str(results))
+    return text, {
+        "rows": len(results),
+        "unique_rows": len(lines),
+        "shown_rows": shown,
+        "tokens": tokens,
+        "raw_tokens": raw_tokens,
+        "tokens_saved": raw_tokens - tokens,
+    }
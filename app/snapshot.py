@@ -0,0 +1,1119 @@
+import asyncio
+import json
+import math
+import os
+import re
+from functools import lru_cache
+
+from dotenv import load_dotenv
+from app.graph import CYPHER_MAX_ROWS, NORMALIZED_PROPERTIES, guard_read_query, is_write_query, unique_keys
+from app.metrics import SNAPSHOT_QUERIES, timed
+from app.seeds import desired_nodes, desired_relationships, load_dataset
+
+load_dotenv()
+
+# neo4j (default) talks to Neo4j directly; snapshot serves reads from an in-memory copy and
+# falls back to Neo4j; dataset serves the seed dataset with no server at all (tests, demos).
+GRAPH_BACKEND = os.getenv("GRAPH_BACKEND", "neo4j")
+# Queries whose intermediate matches exceed this go to Neo4j instead (cartesian products).
+SNAPSHOT_MAX_BINDINGS = int(os.getenv("SNAPSHOT_MAX_BINDINGS", "100000"))
+
+SNAPSHOT_NODES_QUERY = (
+    "MATCH (n) WHERE NOT n:GraphVersion "
+    "RETURN elementId(n) AS key, labels(n) AS labels, properties(n) AS props"
+)
+SNAPSHOT_RELATIONSHIPS_QUERY = (
+    "MATCH (a)-[r]->(b) "
+    "RETURN elementId(a) AS source, type(r) AS type, elementId(b) AS target, properties(r) AS props"
+)
+
+# Properties with a hash index per label, for `{name: $name}` and `x.name_lower = '...'`.
+INDEXED_PROPERTIES = set(unique_keys().values()) | set(NORMALIZED_PROPERTIES) | set(NORMALIZED_PROPERTIES.values())
+
+
+class UnsupportedQuery(Exception):
+    """Raised when the snapshot cannot evaluate a query; it then goes to Neo4j."""
+
+
+# --- Parsing ---
+
+_TOKEN = re.compile(r"""
+    (?P<space>\s+|//[^\n]*|/\*.*?\*/)
+  | (?P<string>'(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*")
+  | (?P<qname>`[^`]+`)
+  | (?P<name>[A-Za-z_]\w*)
+  | (?P<param>\$\w+)
+  | (?P<number>\d+\.\d+|\d+)
+  | (?P<op>->|<-|<>|!=|<=|>=|=~|[()\[\]{}:,.\-+*/%=<>|])
+""", re.S | re.X)
+
+_AGGREGATES = {"count", "collect", "sum", "avg", "min", "max"}
+
+
+def _nullable(fn):
+    return lambda value, *args: None if value is None else fn(value, *args)
+
+
+_FUNCTIONS = {
+    "tolower": _nullable(str.lower),
+    "toupper": _nullable(str.upper),
+    "trim": _nullable(str.strip),
+    "ltrim": _nullable(str.lstrip),
+    "rtrim": _nullable(str.rstrip),
+    "tostring": _nullable(lambda v: str(v).lower() if isinstance(v, bool) else str(v)),
+    "tointeger": _nullable(lambda v: int(float(v))),
+    "tofloat": _nullable(float),
+    "size": _nullable(len),
+    "coalesce": lambda *values: next((v for v in values if v is not None), None),
+    "labels": _nullable(lambda node: list(node.labels)),
+    "type": _nullable(lambda rel: rel.type),
+    "keys": _nullable(lambda entity: list(entity.props)),
+    "properties": _nullable(lambda entity: dict(entity.props)),
+    "head": _nullable(lambda values: values[0] if values else None),
+    "last": _nullable(lambda values: values[-1] if values else None),
+    "reverse": _nullable(lambda values: values[::-1]),
+    "abs": _nullable(abs),
+    # Java's Math.round, as Cypher uses: halves go up (2.5 -> 3.0), not to even like Python.
+    "round": _nullable(lambda v: float(math.floor(v + 0.5))),
+    "split": _nullable(lambda s, sep: s.split(sep)),
+    "replace": _nullable(lambda s, old, new: s.replace(old, new)),
+    "left": _nullable(lambda s, n: s[:n]),
+    "right": _nullable(lambda s, n: s[-n:] if n else ""),
+    "substring": _nullable(lambda s, start, length=None: s[start:] if length is None else s[start:start + length]),
+}
+
+_RESERVED = {
+    "MATCH", "OPTIONAL", "WHERE", "RETURN", "WITH", "UNWIND", "CALL", "YIELD", "ORDER", "BY", "SKIP",
+    "LIMIT", "AS", "AND", "OR", "XOR", "NOT", "IN", "CONTAINS", "STARTS", "ENDS", "IS", "CASE", "UNION",
+    "DISTINCT",
+}
+
+
+def _unquote(text):
+    escapes = {"n": "\n", "t": "\t", "r": "\r"}
+    return re.sub(r"\\(.)", lambda m: escapes.get(m.group(1), m.group(1)), text[1:-1])
+
+
+def _tokenize(text):
+    tokens, pos = [], 0
+    while pos < len(text):
+        match = _TOKEN.match(text, pos)
+        if not match:
+            raise UnsupportedQuery(f"Unexpected character {text[pos]!r}")
+        if match.lastgroup != "space":
+            tokens.append((match.lastgroup, match.group(), match.start(), match.end()))
+        pos = match.end()
+    return tokens
+
+
+class _NodePattern:
+    __slots__ = ("var", "labels", "props")
+
+    def __init__(self, var, labels, props):
+        self.var, self.labels, self.props = var, labels, props
+
+
+class _RelPattern:
+    __slots__ = ("var", "types", "props", "direction")
+
+    def __init__(self, var, types, props, direction):
+        self.var, self.types, self.props, self.direction = var, types, props, direction
+
+
+class _Query:
+    __slots__ = ("clauses", "distinct", "items", "order", "skip", "limit")
+
+    def __init__(self, clauses, distinct, items, order, skip, limit):
+        self.clauses, self.distinct, self.items = clauses, distinct, items
+        self.order, self.skip, self.limit = order, skip, limit
+
+
+class _Parser:
+    """Recursive-descent parser for the read subset the snapshot evaluates:
+
+        (MATCH pattern[, pattern] [WHERE expr] | CALL db.index.fulltext.queryNodes(...)
+         YIELD node AS x [WHERE expr])+
+        RETURN [DISTINCT] items [ORDER BY ...] [SKIP n] [LIMIT n]
+
+    Anything else raises UnsupportedQuery.
+    """
+
+    def __init__(self, text):
+        self.text = text
+        self.tokens = _tokenize(text)
+        self.pos = 0
+        self.anonymous = 0
+        self.aggregates = 0  # aggregate calls parsed so far
+
+    # Token helpers
+
+    def peek(self, offset=0):
+        i = self.pos + offset
+        return self.tokens[i] if i < len(self.tokens) else ("end", "", len(self.text), len(self.text))
+
+    def keyword(self, *words, offset=0):
+        kind, value, _start, _end = self.peek(offset)
+        return kind == "name" and value.upper() in words
+
+    def accept_keyword(self, *words):
+        if self.keyword(*words):
+            self.pos += 1
+            return True
+        return False
+
+    def expect_keyword(self, word):
+        if not self.accept_keyword(word):
+            raise UnsupportedQuery(f"Expected {word} near {self.peek()[1]!r}")
+
+    def op(self, *ops, offset=0):
+        kind, value, _start, _end = self.peek(offset)
+        return kind == "op" and value in ops
+
+    def accept_op(self, *ops):
+        if self.op(*ops):
+            self.pos += 1
+            return True
+        return False
+
+    def expect_op(self, op):
+        if not self.accept_op(op):
+            raise UnsupportedQuery(f"Expected {op!r} near {self.peek()[1]!r}")
+
+    def name(self):
+        kind, value, _start, _end = self.peek()
+        if kind == "name":
+            self.pos += 1
+            return value
+        if kind == "qname":
+            self.pos += 1
+            return value[1:-1]
+        raise UnsupportedQuery(f"Expected a name near {value!r}")
+
+    def variable(self):
+        if self.peek()[0] in ("name", "qname") and not self.keyword(*_RESERVED):
+            return self.name()
+        self.anonymous += 1
+        return f" anon{self.anonymous}"  # the space keeps it apart from query variables
+
+    # Clauses
+
+    def parse(self):
+        clauses = []
+        while True:
+            if self.accept_keyword("MATCH"):
+                patterns = [self.pattern()]
+                while self.accept_op(","):
+                    patterns.append(self.pattern())
+                clauses.append(("match", patterns, self.where()))
+            elif self.accept_keyword("CALL"):
+                clauses.append(("fulltext", self.fulltext_call(), self.where()))
+            else:
+                break
+        if not clauses:
+            raise UnsupportedQuery("Query does not start with MATCH")
+        self.expect_keyword("RETURN")
+        distinct = self.accept_keyword("DISTINCT")
+        if self.op("*"):
+            raise UnsupportedQuery("RETURN * is not supported")
+        items = [self.return_item()]
+        while self.accept_op(","):
+            items.append(self.return_item())
+        order = []
+        if self.accept_keyword("ORDER"):
+            self.expect_keyword("BY")
+            while True:
+                expr = self.plain_expression()
+                descending = self.keyword("DESC", "DESCENDING")
+                self.accept_keyword("ASC", "ASCENDING", "DESC", "DESCENDING")
+                order.append((expr, descending))
+                if not self.accept_op(","):
+                    break
+        skip = self.plain_expression() if self.accept_keyword("SKIP") else None
+        limit = self.plain_expression() if self.accept_keyword("LIMIT") else None
+        if self.peek()[0] != "end":
+            raise UnsupportedQuery(f"Unsupported clause near {self.peek()[1]!r}")
+        return _Query(clauses, distinct, items, order, skip, limit)
+
+    def where(self):
+        return self.plain_expression() if self.accept_keyword("WHERE") else None
+
+    def plain_expression(self):
+        """An expression without aggregates (WHERE, ORDER BY, SKIP, LIMIT)."""
+        before = self.aggregates
+        expr = self.expression()
+        if self.aggregates != before:
+            raise UnsupportedQuery("Aggregates are only supported as RETURN items")
+        return expr
+
+    def fulltext_call(self):
+        """`CALL db.index.fulltext.queryNodes(index, query) YIELD node AS x`, as written by
+        rewrite_for_indexes(). The rewrite keeps the original CONTAINS predicate in the
+        WHERE, so evaluating that filter over all nodes gives the same rows."""
+        procedure = [self.name()]
+        while self.accept_op("."):
+            procedure.append(self.name())
+        if ".".join(procedure).lower() != "db.index.fulltext.querynodes":
+            raise UnsupportedQuery(f"Procedure {'.'.join(procedure)} is not supported")
+        self.expect_op("(")
+        self.expression()
+        self.expect_op(",")
+        self.expression()
+        self.expect_op(")")
+        self.expect_keyword("YIELD")
+        if self.name().lower() != "node":
+            raise UnsupportedQuery("Only YIELD node is supported")
+        self.expect_keyword("AS")
+        return self.name()
+
+    def pattern(self):
+        nodes, rels = [self.node_pattern()], []
+        while self.op("-", "<-"):
+            rels.append(self.rel_pattern())
+            nodes.append(self.node_pattern())
+        return nodes, rels
+
+    def node_pattern(self):
+        self.expect_op("(")
+        var = self.variable()
+        labels = []
+        while self.accept_op(":"):
+            labels.append(self.name())
+        props = self.property_map() if self.op("{") else []
+        self.expect_op(")")
+        return _NodePattern(var, labels, props)
+
+    def rel_pattern(self):
+        incoming = self.accept_op("<-")
+        if not incoming:
+            self.expect_op("-")
+        var, types, props = None, [], []
+        if self.accept_op("["):
+            if self.peek()[0] in ("name", "qname"):
+                var = self.name()
+            if self.accept_op(":"):
+                types.append(self.name())
+                while self.accept_op("|"):
+                    self.accept_op(":")
+                    types.append(self.name())
+            if self.op("*"):
+                raise UnsupportedQuery("Variable-length relationships are not supported")
+            if self.op("{"):
+                props = self.property_map()
+            self.expect_op("]")
+        outgoing = self.accept_op("->")
+        if not outgoing:
+            self.expect_op("-")
+        if incoming and outgoing:
+            raise UnsupportedQuery("Relationship cannot point both ways")
+        direction = "out" if outgoing else "in" if incoming else "both"
+        return _RelPattern(var, types, props, direction)
+
+    def property_map(self):
+        self.expect_op("{")
+        props = []
+        while not self.accept_op("}"):
+            key = self.name()
+            self.expect_op(":")
+            props.append((key, self.expression()))
+            if not self.accept_op(","):
+                self.expect_op("}")
+                break
+        return props
+
+    def return_item(self):
+        start = self.peek()[2]
+        before = self.aggregates
+        expr = self.expression()
+        end = self.tokens[self.pos - 1][3]
+        if self.aggregates != before and not (self.aggregates == before + 1 and _is_aggregate(expr)):
+            raise UnsupportedQuery("Aggregates nested in expressions are not supported")
+        name = self.name() if self.accept_keyword("AS") else self.text[start:end]
+        return expr, name
+
+    # Expressions, lowest precedence first
+
+    def expression(self):
+        left = self.xor_expr()
+        while self.accept_keyword("OR"):
+            left = ("or", left, self.xor_expr())
+        return left
+
+    def xor_expr(self):
+        left = self.and_expr()
+        while self.accept_keyword("XOR"):
+            left = ("xor", left, self.and_expr())
+        return left
+
+    def and_expr(self):
+        left = self.not_expr()
+        while self.accept_keyword("AND"):
+            left = ("and", left, self.not_expr())
+        return left
+
+    def not_expr(self):
+        if self.accept_keyword("NOT"):
+            return ("not", self.not_expr())
+        return self.comparison()
+
+    def comparison(self):
+        left = self.additive()
+        while True:
+            if self.op("=", "<>", "!=", "<", ">", "<=", ">=", "=~"):
+                op = self.peek()[1]
+                self.pos += 1
+                left = ("cmp", op, left, self.additive())
+            elif self.accept_keyword("IN"):
+                left = ("cmp", "in", left, self.additive())
+            elif self.accept_keyword("CONTAINS"):
+                left = ("cmp", "contains", left, self.additive())
+            elif self.keyword("STARTS", "ENDS"):
+                op = self.peek()[1].lower()
+                self.pos += 1
+                self.expect_keyword("WITH")
+                left = ("cmp", op, left, self.additive())
+            elif self.accept_keyword("IS"):
+                negate = self.accept_keyword("NOT")
+                self.expect_keyword("NULL")
+                left = ("isnull", left, negate)
+            else:
+                return left
+
+    def additive(self):
+        left = self.multiplicative()
+        while self.op("+", "-"):
+            op = self.peek()[1]
+            self.pos += 1
+            left = ("arith", op, left, self.multiplicative())
+        return left
+
+    def multiplicative(self):
+        left = self.unary()
+        while self.op("*", "/", "%"):
+            op = self.peek()[1]
+            self.pos += 1
+            left = ("arith", op, left, self.unary())
+        return left
+
+    def unary(self):
+        if self.accept_op("-"):
+            return ("neg", self.unary())
+        self.accept_op("+")
+        return self.postfix()
+
+    def postfix(self):
+        expr = self.atom()
+        while True:
+            if self.accept_op("."):
+                expr = ("prop", expr, self.name())
+            elif self.accept_op("["):
+                index = self.expression()
+                self.expect_op("]")
+                expr = ("index", expr, index)
+            elif self.op(":") and expr[0] == "var":
+                labels = []
+                while self.accept_op(":"):
+                    labels.append(self.name())
+                expr = ("haslabel", expr, labels)
+            elif self.op("{") and expr[0] == "var":
+                expr = ("mapproj", expr[1], self.map_projection())
+            else:
+                return expr
+
+    def map_projection(self):
+        self.expect_op("{")
+        items = []
+        while not self.accept_op("}"):
+            if self.accept_op("."):
+                if self.accept_op("*"):
+                    items.append(("*", None))
+                else:
+                    items.append((self.name(), None))
+            else:
+                key = self.name()
+                self.expect_op(":")
+                items.append((key, self.expression()))
+            if not self.accept_op(","):
+                self.expect_op("}")
+                break
+        return items
+
+    def atom(self):
+        kind, value, _start, _end = self.peek()
+        if kind == "number":
+            self.pos += 1
+            return ("lit", float(value) if "." in value else int(value))
+        if kind == "string":
+            self.pos += 1
+            return ("lit", _unquote(value))
+        if kind == "param":
+            self.pos += 1
+            return ("param", value[1:])
+        if kind == "qname":
+            return ("var", self.name())
+        if self.accept_op("("):
+            expr = self.expression()
+            self.expect_op(")")
+            return expr
+        if self.accept_op("["):
+            return self.list_literal()
+        if self.op("{"):
+            return ("map", self.property_map())
+        if kind != "name":
+            raise UnsupportedQuery(f"Unexpected {value!r}")
+        upper = value.upper()
+        if upper in ("TRUE", "FALSE"):
+            self.pos += 1
+            return ("lit", upper == "TRUE")
+        if upper == "NULL":
+            self.pos += 1
+            return ("lit", None)
+        if self.op("(", offset=1):
+            return self.function_call()
+        if upper in _RESERVED:
+            raise UnsupportedQuery(f"Unexpected {value}")
+        self.pos += 1
+        return ("var", value)
+
+    def function_call(self):
+        name = self.name().lower()
+        self.expect_op("(")
+        if name == "count" and self.accept_op("*"):
+            self.expect_op(")")
+            self.aggregates += 1
+            return ("count_star",)
+        if name not in _FUNCTIONS and name not in _AGGREGATES:
+            raise UnsupportedQuery(f"Function {name}() is not supported")
+        distinct = self.accept_keyword("DISTINCT")
+        args = []
+        if not self.op(")"):
+            args.append(self.expression())
+            while self.accept_op(","):
+                args.append(self.expression())
+        self.expect_op(")")
+        if name in _AGGREGATES:
+            if len(args) != 1:
+                raise UnsupportedQuery(f"{name}() takes one argument")
+            self.aggregates += 1
+        return ("call", name, distinct, args)
+
+    def list_literal(self):
+        if self.peek()[0] in ("name", "qname") and self.keyword("IN", offset=1):
+            var = self.name()
+            self.expect_keyword("IN")
+            source = self.expression()
+            where = self.expression() if self.accept_keyword("WHERE") else None
+            projection = self.expression() if self.accept_op("|") else None
+            self.expect_op("]")
+            return ("comp", var, source, where, projection)
+        items = []
+        while not self.accept_op("]"):
+            items.append(self.expression())
+            if not self.accept_op(","):
+                self.expect_op("]")
+                break
+        return ("list", items)
+
+
+@lru_cache(maxsize=1024)
+def _parse_cached(query):
+    try:
+        return _Parser(query).parse()
+    except (UnsupportedQuery, IndexError) as e:
+        return UnsupportedQuery(str(e))
+
+
+def parse_query(query: str) -> _Query:
+    """Parses a query in the subset the snapshot evaluates; results (and refusals) are cached."""
+    plan = _parse_cached(query)
+    if isinstance(plan, UnsupportedQuery):
+        raise UnsupportedQuery(str(plan))
+    return plan
+
+
+# --- Evaluation ---
+
+_EDGES = " edges"  # relationships already used by the current MATCH (Cypher uniqueness)
+
+
+class _Node:
+    __slots__ = ("id", "labels", "props")
+
+    def __init__(self, id, labels, props):
+        self.id, self.labels, self.props = id, labels, props
+
+
+class _Rel:
+    __slots__ = ("id", "type", "start", "end", "props")
+
+    def __init__(self, id, type, start, end, props):
+        self.id, self.type, self.start, self.end, self.props = id, type, start, end, props
+
+
+def _freeze(value):
+    """Hashable stand-in for a value, for grouping, DISTINCT and index lookups."""
+    if isinstance(value, (_Node, _Rel)):
+        return (type(value).__name__, value.id)
+    if isinstance(value, list):
+        return ("list", tuple(_freeze(v) for v in value))
+    if isinstance(value, dict):
+        return ("map", tuple(sorted((k, _freeze(v)) for k, v in value.items())))
+    if isinstance(value, bool):
+        return ("bool", value)
+    return value
+
+
+def _output(value):
+    """Converts to what neo4j's record.data() returns: nodes become property maps."""
+    if isinstance(value, _Node):
+        return dict(value.props)
+    if isinstance(value, _Rel):
+        return (dict(value.start.props), value.type, dict(value.end.props))
+    if isinstance(value, list):
+        return [_output(v) for v in value]
+    if isinstance(value, dict):
+        return {k: _output(v) for k, v in value.items()}
+    return value
+
+
+def _sort_key(value):
+    # Cypher ascending order: maps/nodes/lists, strings, booleans, numbers, then null.
+    if value is None:
+        return (2, 0, 0)
+    if isinstance(value, str):
+        return (1, 0, value)
+    if isinstance(value, bool):
+        return (1, 1, value)
+    if isinstance(value, (int, float)):
+        return (1, 2, value)
+    return (0, 0, json.dumps(_output(value), sort_keys=True, default=str))
+
+
+def _boolean(value):
+    if value is not None and not isinstance(value, bool):
+        raise UnsupportedQuery("Expected a boolean")
+    return value
+
+
+def _equal(a, b):
+    if a is None or b is None:
+        return None
+    if isinstance(a, (_Node, _Rel)) or isinstance(b, (_Node, _Rel)):
+        return a is b
+    if isinstance(a, bool) != isinstance(b, bool):
+        return False
+    if isinstance(a, list) and isinstance(b, list):
+        if len(a) != len(b):
+            return False
+        results = [_equal(x, y) for x, y in zip(a, b)]
+        if False in results:
+            return False
+        return None if None in results else True
+    return a == b
+
+
+def _compare(op, a, b):
+    if op == "in":
+        if b is None:
+            return None
+        if not isinstance(b, list):
+            raise UnsupportedQuery("IN expects a list")
+        results = [_equal(a, item) for item in b]
+        if True in results:
+            return True
+        return None if None in results else False
+    if a is None or b is None:
+        return None
+    if op == "=":
+        return _equal(a, b)
+    if op in ("<>", "!="):
+        equal = _equal(a, b)
+        return None if equal is None else not equal
+    if op in ("contains", "starts", "ends", "=~"):
+        if not (isinstance(a, str) and isinstance(b, str)):
+            return None
+        if op == "contains":
+            return b in a
+        if op == "starts":
+            return a.startswith(b)
+        if op == "ends":
+            return a.endswith(b)
+        return re.fullmatch(b, a) is not None
+    numbers = all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in (a, b))
+    if not (numbers or (isinstance(a, str) and isinstance(b, str))):
+        return None
+    return {"<": a < b, ">": a > b, "<=": a <= b, ">=": a >= b}[op]
+
+
+def _arith(op, a, b):
+    if a is None or b is None:
+        return None
+    if op == "+":
+        if isinstance(a, list) or isinstance(b, list):
+            return (a if isinstance(a, list) else [a]) + (b if isinstance(b, list) else [b])
+        if isinstance(a, str) or isinstance(b, str):
+            return f"{a}{b}"
+        return a + b
+    if op == "-":
+        return a - b
+    if op == "*":
+        return a * b
+    # Cypher truncates toward zero like Java: -7 / 2 = -3, -7 % 2 = -1, -7.5 % 2 = -1.5.
+    integers = isinstance(a, int) and isinstance(b, int)
+    if op == "/":
+        if integers:
+            quotient = abs(a) // abs(b)
+            return quotient if (a < 0) == (b < 0) else -quotient
+        return a / b
+    if integers:
+        remainder = abs(a) % abs(b)
+        return remainder if a >= 0 else -remainder
+    return math.fmod(a, b)
+
+
+def _evaluate(expr, scope, params):
+    kind = expr[0]
+    if kind == "lit":
+        return expr[1]
+    if kind == "param":
+        if expr[1] not in params:
+            raise UnsupportedQuery(f"Missing parameter ${expr[1]}")
+        return params[expr[1]]
+    if kind == "var":
+        if expr[1] not in scope:
+            raise UnsupportedQuery(f"Unknown variable {expr[1]}")
+        return scope[expr[1]]
+    if kind == "prop":
+        target = _evaluate(expr[1], scope, params)
+        if target is None:
+            return None
+        if isinstance(target, (_Node, _Rel)):
+            return target.props.get(expr[2])
+        if isinstance(target, dict):
+            return target.get(expr[2])
+        raise UnsupportedQuery("Property access on a non-entity")
+    if kind == "index":
+        target, index = _evaluate(expr[1], scope, params), _evaluate(expr[2], scope, params)
+        if target is None or index is None:
+            return None
+        if isinstance(target, list) and isinstance(index, int):
+            return target[index] if -len(target) <= index < len(target) else None
+        if isinstance(target, dict) and isinstance(index, str):
+            return target.get(index)
+        raise UnsupportedQuery("Unsupported subscript")
+    if kind == "haslabel":
+        node = _evaluate(expr[1], scope, params)
+        return None if node is None else all(label in node.labels for label in expr[2])
+    if kind == "not":
+        value = _boolean(_evaluate(expr[1], scope, params))
+        return None if value is None else not value
+    if kind in ("and", "or", "xor"):
+        a = _boolean(_evaluate(expr[1], scope, params))
+        b = _boolean(_evaluate(expr[2], scope, params))
+        if kind == "and":
+            return False if False in (a, b) else None if None in (a, b) else True
+        if kind == "or":
+            return True if True in (a, b) else None if None in (a, b) else False
+        return None if None in (a, b) else a != b
+    if kind == "cmp":
+        return _compare(expr[1], _evaluate(expr[2], scope, params), _evaluate(expr[3], scope, params))
+    if kind == "isnull":
+        is_null = _evaluate(expr[1], scope, params) is None
+        return not is_null if expr[2] else is_null
+    if kind == "arith":
+        return _arith(expr[1], _evaluate(expr[2], scope, params), _evaluate(expr[3], scope, params))
+    if kind == "neg":
+        value = _evaluate(expr[1], scope, params)
+        return None if value is None else -value
+    if kind == "list":
+        return [_evaluate(item, scope, params) for item in expr[1]]
+    if kind == "map":
+        return {key: _evaluate(value, scope, params) for key, value in expr[1]}
+    if kind == "comp":
+        _kind, var, source, where, projection = expr
+        values = _evaluate(source, scope, params)
+        if values is None:
+            return None
+        result = []
+        for value in values:
+            inner = {**scope, var: value}
+            if where is not None and _evaluate(where, inner, params) is not True:
+                continue
+            result.append(_evaluate(projection, inner, params) if projection else value)
+        return result
+    if kind == "mapproj":
+        entity = _evaluate(("var", expr[1]), scope, params)
+        if entity is None:
+            return None
+        props = entity.props if isinstance(entity, (_Node, _Rel)) else entity
+        result = {}
+        for key, value in expr[2]:
+            if key == "*":
+                result.update(props)
+            else:
+                result[key] = props.get(key) if value is None else _evaluate(value, scope, params)
+        return result
+    if kind == "call" and expr[1] in _FUNCTIONS:
+        return _FUNCTIONS[expr[1]](*(_evaluate(arg, scope, params) for arg in expr[3]))
+    raise UnsupportedQuery(f"Cannot evaluate {kind} here")
+
+
+def _is_aggregate(expr):
+    return expr[0] == "count_star" or (expr[0] == "call" and expr[1] in _AGGREGATES)
+
+
+def _conjuncts(expr):
+    if expr is None:
+        return []
+    if expr[0] == "and":
+        return _conjuncts(expr[1]) + _conjuncts(expr[2])
+    return [expr]
+
+
+def _equality_hints(where):
+    """var -> [(property, constant expr)] from `x.prop = constant` conjuncts of a WHERE."""
+    hints = {}
+    for expr in _conjuncts(where):
+        if expr[0] != "cmp" or expr[1] != "=":
+            continue
+        for left, right in ((expr[2], expr[3]), (expr[3], expr[2])):
+            if left[0] == "prop" and left[1][0] == "var" and right[0] in ("lit", "param"):
+                hints.setdefault(left[1][1], []).append((left[2], right))
+    return hints
+
+
+class GraphSnapshot:
+    """Immutable in-memory copy of the graph.
+
+    Nodes are indexed by label and by INDEXED_PROPERTIES; relationships are kept as
+    per-type outgoing and incoming adjacency lists. run() evaluates the query subset
+    accepted by parse_query() and raises UnsupportedQuery for everything else.
+    """
+
+    def __init__(self, nodes, relationships, version=None):
+        """`nodes` yields (key, labels, props); `relationships` yields (source key, type, target key, props)."""
+        self.version = version
+        self.nodes = []
+        self.by_label = {}
+        self.index = {}
+        by_key = {}
+        for key, labels, props in nodes:
+            node = _Node(len(self.nodes), tuple(labels), {k: v for k, v in props.items() if v is not None})
+            by_key[key] = node
+            self.nodes.append(node)
+            for label in node.labels:
+                self.by_label.setdefault(label, []).append(node)
+                for prop in INDEXED_PROPERTIES:
+                    if prop in node.props:
+                        self.index.setdefault((label, prop), {}).setdefault(_freeze(node.props[prop]), []).append(node)
+
+        self.edges = []
+        self.outgoing = {}
+        self.incoming = {}
+        for source, rel_type, target, props in relationships:
+            if source not in by_key or target not in by_key:
+                continue
+            edge = _Rel(len(self.edges), rel_type, by_key[source], by_key[target], dict(props or {}))
+            self.edges.append(edge)
+            self.outgoing.setdefault(rel_type, {}).setdefault(edge.start.id, []).append(edge)
+            self.incoming.setdefault(rel_type, {}).setdefault(edge.end.id, []).append(edge)
+
+    @classmethod
+    def from_dataset(cls, data=None):
+        """Snapshot of the seed dataset, as sync_data() would write it."""
+        data = data or load_dataset()
+        nodes = [
+            ((label, key), [label], props)
+            for label, by_key in desired_nodes(data).items()
+            for key, props in by_key.items()
+        ]
+        relationships = [
+            ((source, source_key), rel_type, (target, target_key), props)
+            for (source, rel_type, target), edges in desired_relationships(data).items()
+            for (source_key, target_key), props in edges.items()
+        ]
+        return cls(nodes, relationships, version="dataset")
+
+    def run(self, query, parameters=None) -> list:
+        plan = parse_query(query)
+        try:
+            return self._execute(plan, parameters or {})
+        except (TypeError, AttributeError, ValueError, ZeroDivisionError, re.error) as e:
+            # Neo4j reports these as errors; let it produce the real message.
+            raise UnsupportedQuery(str(e)) from e
+
+    def _execute(self, plan, params):
+        scopes = [{}]
+        for kind, body, where in plan.clauses:
+            if kind == "match":
+                hints = _equality_hints(where)
+                scopes = [{**scope, _EDGES: frozenset()} for scope in scopes]
+                for pattern in body:
+                    scopes = [s for scope in scopes for s in self._match(pattern, scope, params, hints)]
+            else:
+                if any(body in scope for scope in scopes):
+                    raise UnsupportedQuery(f"{body} is already bound")
+                scopes = [{**scope, body: node} for scope in scopes for node in self.nodes]
+            if where is not None:
+                scopes = [scope for scope in scopes if _boolean(_evaluate(where, scope, params)) is True]
+            if len(scopes) > SNAPSHOT_MAX_BINDINGS:
+                raise UnsupportedQuery("Too many intermediate matches")
+        return self._project(plan, scopes, params)
+
+    # Matching
+
+    def _candidates(self, pattern, scope, params, hints):
+        if pattern.var in scope:
+            bound = scope[pattern.var]
+            return [bound] if isinstance(bound, _Node) else []
+        equalities = [(key, expr) for key, expr in pattern.props if expr[0] in ("lit", "param")]
+        equalities += hints.get(pattern.var, [])
+        for label in pattern.labels:
+            for prop, expr in equalities:
+                index = self.index.get((label, prop))
+                if index is not None:
+                    return index.get(_freeze(_evaluate(expr, {}, params)), [])
+        if pattern.labels:
+            return min((self.by_label.get(label, []) for label in pattern.labels), key=len)
+        return self.nodes
+
+    def _node_matches(self, pattern, node, scope, params):
+        return (all(label in node.labels for label in pattern.labels)
+                and all(_equal(node.props.get(key), _evaluate(expr, scope, params)) is True
+                        for key, expr in pattern.props))
+
+    def _edges(self, node, types, direction):
+        """(relationship, neighbour) pairs of `node` in `direction` ('out', 'in' or 'both')."""
+        for rel_type in types or list(self.outgoing.keys() | self.incoming.keys()):
+            if direction in ("out", "both"):
+                for edge in self.outgoing.get(rel_type, {}).get(node.id, ()):
+                    yield edge, edge.end
+            if direction in ("in", "both"):
+                for edge in self.incoming.get(rel_type, {}).get(node.id, ()):
+                    yield edge, edge.start
+
+    def _match(self, pattern, scope, params, hints):
+        """Scopes extending `scope` with every match of one path pattern.
+
+        Matching starts from the node pattern with the fewest candidates (bound variable,
+        indexed property, smallest label) and walks the relationships outwards from it.
+        """
+        nodes, rels = pattern
+        candidates = [self._candidates(node, scope, params, hints) for node in nodes]
+        start = min(range(len(nodes)), key=lambda i: len(candidates[i]))
+        scopes = [
+            {**scope, nodes[start].var: node}
+            for node in candidates[start]
+            if self._node_matches(nodes[start], node, scope, params)
+        ]
+        reverse = {"out": "in", "in": "out", "both": "both"}
+        for i in range(start, len(rels)):
+            scopes = self._expand(scopes, rels[i], nodes[i], nodes[i + 1], rels[i].direction, params)
+        for i in range(start - 1, -1, -1):
+            scopes = self._expand(scopes, rels[i], nodes[i + 1], nodes[i], reverse[rels[i].direction], params)
+        return scopes
+
+    def _expand(self, scopes, rel, source, target, direction, params):
+        expanded = []
+        for scope in scopes:
+            for edge, neighbour in self._edges(scope[source.var], rel.types, direction):
+                if edge.id in scope[_EDGES]:
+                    continue
+                if target.var in scope and scope[target.var] is not neighbour:
+                    continue
+                if rel.var and rel.var in scope:
+                    raise UnsupportedQuery(f"{rel.var} is already bound")
+                if not self._node_matches(target, neighbour, scope, params):
+                    continue
+                if not all(_equal(edge.props.get(k), _evaluate(e, scope, params)) is True for k, e in rel.props):
+                    continue
+                extended = {**scope, target.var: neighbour, _EDGES: scope[_EDGES] | {edge.id}}
+                if rel.var:
+                    extended[rel.var] = edge
+                expanded.append(extended)
+            if len(expanded) > SNAPSHOT_MAX_BINDINGS:
+                raise UnsupportedQuery("Too many intermediate matches")
+        return expanded
+
+    # Projection
+
+    def _aggregate(self, expr, scopes, params):
+        if expr[0] == "count_star":
+            return len(scopes)
+        _kind, name, distinct, (arg,) = expr
+        values = [v for v in (_evaluate(arg, scope, params) for scope in scopes) if v is not None]
+        if distinct:
+            values = list({_freeze(v): v for v in values}.values())
+        if name == "count":
+            return len(values)
+        if name == "collect":
+            return values
+        if name == "sum":
+            return sum(values)
+        if not values:
+            return None
+        if name == "avg":
+            return sum(values) / len(values)
+        return (min if name == "min" else max)(values, key=_sort_key)
+
+    def _project(self, plan, scopes, params):
+        items = plan.items
+        aggregated = [_is_aggregate(expr) for expr, _name in items]
+
+        if any(aggregated):
+            groups = {}
+            for scope in scopes:
+                values = [None if agg else _evaluate(expr, scope, params) for (expr, _n), agg in zip(items, aggregated)]
+                key = tuple(_freeze(v) for v, agg in zip(values, aggregated) if not agg)
+                groups.setdefault(key, (values, []))[1].append(scope)
+            if not groups and all(aggregated):
+                groups[()] = ([None] * len(items), [])
+            rows = [
+                ({name: self._aggregate(expr, members, params) if agg else value
+                  for (expr, name), agg, value in zip(items, aggregated, values)}, None)
+                for values, members in groups.values()
+            ]
+        else:
+            rows = [({name: _evaluate(expr, scope, params) for expr, name in items}, scope) for scope in scopes]
+
+        if plan.distinct:
+            seen, unique = set(), []
+            for row, scope in rows:
+                key = tuple(_freeze(v) for v in row.values())
+                if key not in seen:
+                    seen.add(key)
+                    unique.append((row, scope))
+            rows = unique
+        for expr, descending in reversed(plan.order):
+            rows.sort(key=lambda r: _sort_key(self._order_value(expr, r, items, params)), reverse=descending)
+
+        skip = self._count(plan.skip, params) if plan.skip else 0
+        limit = self._count(plan.limit, params) if plan.limit else None
+        rows = rows[skip:] if limit is None else rows[skip:skip + limit]
+        return [{name: _output(value) for name, value in row.items()} for row, _scope in rows]
+
+    @staticmethod
+    def _order_value(expr, row_scope, items, params):
+        row, scope = row_scope
+        for item, name in items:
+            if expr == item or expr == ("var", name):
+                return row[name]
+        if scope is None:
+            raise UnsupportedQuery("ORDER BY after aggregation must use returned columns")
+        return _evaluate(expr, {**scope, **row}, params)
+
+    @staticmethod
+    def _count(expr, params):
+        value = _evaluate(expr, {}, params)
+        if not isinstance(value, int) or isinstance(value, bool) or value < 0:
+            raise UnsupportedQuery("SKIP/LIMIT must be a non-negative integer")
+        return value
+
+
+class SnapshotGraph:
+    """Read-only graph backend serving common read shapes from an in-memory snapshot.
+
+    Same query()/read_query() interface as AsyncNeo4jGraph. Writes and queries the
+    snapshot cannot evaluate go to `fallback`, and the snapshot is reloaded from it when
+    the graph version changes. Without a fallback (from_dataset) nothing needs a server.
+    """
+
+    def __init__(self, fallback=None, snapshot=None):
+        self.fallback = fallback
+        self.snapshot = snapshot
+        self._lock = asyncio.Lock()
+
+    @classmethod
+    def from_dataset(cls, data=None):
+        return cls(snapshot=GraphSnapshot.from_dataset(data))
+
+    async def refresh(self):
+        """Reloads the snapshot when the fallback's graph version has moved on."""
+        if self.fallback is None:
+            return self.snapshot
+        try:
+            version = await self.fallback.current_version()
+            if self.snapshot is None or self.snapshot.version != version:
+                async with self._lock:
+                    if self.snapshot is None or self.snapshot.version != version:
+                        self.snapshot = await self._load(version)
+        except Exception as e:
+            print(f"Snapshot refresh failed, reading from Neo4j: {e}")
+        return self.snapshot
+
+    async def _load(self, version):
+        # Straight to the driver: a full copy of the graph does not belong in the result cache.
+        nodes = await self.fallback._run(SNAPSHOT_NODES_QUERY)
+        relationships = await self.fallback._run(SNAPSHOT_RELATIONSHIPS_QUERY)
+        snapshot = GraphSnapshot(
+            ((r["key"], r["labels"], r["props"]) for r in nodes),
+            ((r["source"], r["type"], r["target"], r["props"]) for r in relationships),
+            version=version,
+        )
+        print(f"Loaded graph snapshot: {len(snapshot.nodes)} nodes, {len(snapshot.edges)} relationships")
+        return snapshot
+
+    async def _run_local(self, query, parameters):
+        snapshot = await self.refresh()
+        if snapshot is None:
+            raise UnsupportedQuery("No snapshot loaded")
+        with timed("snapshot"):
+            rows = snapshot.run(query, parameters)
+        SNAPSHOT_QUERIES.inc(result="local")
+        return rows
+
+    async def query(self, query, parameters=None, bump_version=True):
+        if is_write_query(query):
+            if self.fallback is None:
+                raise UnsupportedQuery("The snapshot backend is read-only.")
+            return await self.fallback.query(query, parameters, bump_version=bump_version)
+        try:
+            return await self._run_local(query, parameters)
+        except UnsupportedQuery:
+            if self.fallback is None:
+                raise
+        SNAPSHOT_QUERIES.inc(result="fallback")
+        return await self.fallback.query(query, parameters)
+
+    async def read_query(self, query, parameters=None, timeout=None, max_rows=None,
+                         fetch_size=None, max_estimated_rows=None):
+        max_rows = max_rows or CYPHER_MAX_ROWS
+        guarded = guard_read_query(query, max_rows)
+        try:
+            return (await self._run_local(guarded, parameters))[:max_rows]
+        except UnsupportedQuery:
+            if self.fallback is None:
+                raise
+        SNAPSHOT_QUERIES.inc(result="fallback")
+        return await self.fallback.read_query(query, parameters, timeout, max_rows, fetch_size, max_estimated_rows)
+
+    async def warm_up(self, connections=None):
+        """Warms the Neo4j fallback and loads the snapshot."""
+        if self.fallback is not None:
+            await self.fallback.warm_up(connections)
+            await self.refresh()
+
+    async def current_version(self):
+        if self.fallback is None:
+            return self.snapshot.version if self.snapshot else None
+        return await self.fallback.current_version()
+
+    async def bump_version(self):
+        if self.fallback is not None:
+            return await self.fallback.bump_version()
+
+    async def init_schema(self):
+        if self.fallback is not None:
+            await self.fallback.init_schema()
+
+    async def close(self):
+        if self.fallback is not None:
+            await self.fallback.close()
+
+
+def backend_from_env(graph):
+    """The request-path graph backend selected by GRAPH_BACKEND, in front of `graph`."""
+    if GRAPH_BACKEND == "snapshot":
+        return SnapshotGraph(fallback=graph)
+    if GRAPH_BACKEND == "dataset":
+        return SnapshotGraph.from_dataset()
+    return graph
@@ -0,0 +1,32 @@
+"""The graph's node and relationship specs: what the seed data loads and the schema describes.
+
+Shared by the seeder (app/seeds.py), the schema fallback, the Cypher templates and the
+synthetic data generator, so none of them has to import the seeding CLI.
+"""
+
+# label -> (dataset, managed properties). Keys come from the constraints in init_schema.
+# Event dates are kept to published editions; descriptions align to LinkedIn/Facebook recaps.
+# Member personal names are omitted to avoid incorrect attributions; roles and duties are
+# sourced from public role descriptions.
+NODE_SPECS = {
+    "Department": ("departments", ["name", "focus"]),
+    "Event": ("events", ["name", "date", "description", "location", "theme", "format", "source"]),
+    "Project": ("projects", ["name", "year", "status", "description", "source"]),
+    "Partner": ("partners", ["name", "kind", "focus", "source"]),
+    "Member": ("members", ["id", "name", "role", "joined", "expertise", "source"]),
+}
+
+# (source label, type, target label) -> how to read the edges from the dataset:
+# (dataset, source field, target field, relationship properties)
+RELATIONSHIP_SPECS = {
+    ("Department", "LEADS", "Project"): ("projects", "lead_department", "name", []),
+    ("Project", "FEATURED_IN", "Event"): ("projects", "name", "showcased_at", []),
+    ("Partner", "SPONSORS", "Event"): ("partners", "name", "supports_events", []),
+    ("Partner", "SUPPORTS", "Project"): ("partners", "name", "supports_projects", []),
+    ("Member", "MEMBER_OF", "Department"): ("members", "id", "department", []),
+    ("Member", "ORGANIZES", "Event"): ("members", "id", "organizes", []),
+    ("Department", "HOSTS", "Event"): ("hostings", "department", "event", []),
+    ("Member", "CONTRIBUTES_TO", "Project"): ("contributions", "member_id", "project", ["scope"]),
+}
+
+DATASETS = sorted({spec[0] for spec in NODE_SPECS.values()} | {spec[0] for spec in RELATIONSHIP_SPECS.values()})
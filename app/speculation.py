@@ -0,0 +1,45 @@
+import asyncio
+import threading
+import time
+from collections import deque
+
+
+class SpeculationBudget:
+    """Sliding-window cap on LLM calls started before their result is known to be needed."""
+
+    def __init__(self, max_calls=120, window=60.0):
+        self.max_calls = max_calls
+        self.window = window
+        self.started = 0
+        self.wasted = 0
+        self.denied = 0
+        self._calls = deque()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            while self._calls and now - self._calls[0] > self.window:
+                self._calls.popleft()
+            if len(self._calls) >= self.max_calls:
+                self.denied += 1
+                return False
+            self._calls.append(now)
+            self.started += 1
+            return True
+
+    def discard(self, task: asyncio.Task):
+        """Cancels a speculative task whose branch lost and records the spend as wasted."""
+        self.wasted += 1
+        task.cancel()
+        # Retrieve the outcome so a task that already failed does not log a warning.
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+
+    def stats(self) -> dict:
+        return {
+            "started": self.started,
+            "wasted": self.wasted,
+            "denied": self.denied,
+            "max_calls": self.max_calls,
+            "window": self.window,
+        }
@@ -0,0 +1,203 @@
+import argparse
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+from app.graph import graph_db, unique_keys, with_normalized
+from app.specs import NODE_SPECS, RELATIONSHIP_SPECS
+
+TOPICS = [
+    "AI", "cloud", "cybersecurity", "web development", "mobile apps", "data engineering",
+    "UI/UX", "open source", "DevOps", "robotics", "game development", "entrepreneurship",
+]
+FORMATS = ["Conference", "Workshop", "Hackathon", "Bootcamp", "Meetup", "Open day"]
+STATUSES = ["Ongoing", "In production", "Maintained", "Published", "Archived"]
+ROLES = ["Member", "Technical Lead", "Design Lead", "Community Manager", "Operations Lead", "Mentor"]
+PARTNER_KINDS = ["Academic", "Community", "Company", "NGO"]
+
+
+class SyntheticGraph:
+    """Deterministic, streamed dataset following the seed schema at arbitrary scale.
+
+    Entity counts default to ratios of `members`; `fanout` bounds how many events,
+    projects or partners each source node links to. Nothing is materialized: nodes and
+    relationships are generated on iteration, so millions of nodes stay cheap in memory.
+    """
+
+    def __init__(self, members=10000, fanout=3, seed=42, departments=None, events=None,
+                 projects=None, partners=None):
+        self.counts = {
+            "Member": members,
+            "Department": departments or max(7, members // 500),
+            "Event": events or max(5, members // 20),
+            "Project": projects or max(4, members // 25),
+            "Partner": partners or max(3, members // 200),
+        }
+        self.fanout = fanout
+        self.seed = seed
+
+    def key(self, label, i):
+        return f"member-{i}" if label == "Member" else f"{label} {i}"
+
+    def _rng(self, label, i):
+        return random.Random(f"{self.seed}:{label}:{i}")
+
+    def _pick(self, rng, label, k):
+        n = self.counts[label]
+        return [self.key(label, j) for j in sorted({rng.randrange(n) for _ in range(k)})]
+
+    def nodes(self, label):
+        """Yields property dicts for every node of `label`."""
+        build = getattr(self, f"_{label.lower()}")
+        for i in range(self.counts[label]):
+            rng = self._rng(label, i)
+            yield build(i, rng, rng.choice(TOPICS))
+
+    def _department(self, i, rng, topic):
+        return {"name": self.key("Department", i), "focus": f"{topic} and club activities"}
+
+    def _event(self, i, rng, topic):
+        return {
+            "name": self.key("Event", i),
+            "date": f"{rng.randint(2019, 2025)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+            "description": f"{rng.choice(FORMATS)} about {topic} for students.",
+            "location": f"Room {rng.randint(1, 40)}, Blida 1",
+            "theme": topic,
+            "format": rng.choice(FORMATS),
+            "source": "synthetic",
+        }
+
+    def _project(self, i, rng, topic):
+        return {
+            "name": self.key("Project", i),
+            "year": rng.randint(2019, 2025),
+            "status": rng.choice(STATUSES),
+            "description": f"Student project exploring {topic}.",
+            "source": "synthetic",
+        }
+
+    def _partner(self, i, rng, topic):
+        return {
+            "name": self.key("Partner", i),
+            "kind": rng.choice(PARTNER_KINDS),
+            "focus": f"Support for {topic} initiatives",
+            "source": "synthetic",
+        }
+
+    def _member(self, i, rng, topic):
+        return {
+            "id": self.key("Member", i),
+            "name": f"Member {i}",
+            "role": rng.choice(ROLES),
+            "joined": rng.randint(2018, 2025),
+            "expertise": f"{topic}, {rng.choice(TOPICS)}",
+            "source": "synthetic",
+        }
+
+    def relationships(self, spec):
+        """Yields {source, target, props} rows for one (source label, type, target label)."""
+        source, rel_type, target = spec
+        for i in range(self.counts[source]):
+            rng = self._rng(f"{source}:{rel_type}", i)
+            # Single-valued edges (member -> department, department -> project lead) get one target.
+            k = 1 if rel_type in ("MEMBER_OF", "LEADS") else rng.randint(0, self.fanout)
+            for target_key in self._pick(rng, target, k):
+                props = {"scope": rng.choice(TOPICS)} if rel_type == "CONTRIBUTES_TO" else {}
+                yield {"source": self.key(source, i), "target": target_key, "props": props}
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+class BulkLoader:
+    """Streams a SyntheticGraph into Neo4j in chunked UNWIND batches.
+
+    Node labels are independent, so each label loads in its own thread and transaction
+    stream. Relationship types then load one at a time, since parallel writers touching
+    the same nodes would contend for locks.
+    """
+
+    def __init__(self, graph=graph_db, batch_size=5000, workers=4):
+        self.graph = graph
+        self.batch_size = batch_size
+        self.workers = workers
+        self.keys = unique_keys()
+
+    def load_nodes(self, dataset, label):
+        key = self.keys[label]
+        query = f"""
+            UNWIND $rows AS row
+            MERGE (n:{label} {{{key}: row.{key}}})
+            SET n += row
+            """
+        count = 0
+        for batch in batched(map(with_normalized, dataset.nodes(label)), self.batch_size):
+            self.graph.query(query, {"rows": batch}, bump_version=False)
+            count += len(batch)
+        return count
+
+    def load_relationships(self, dataset, spec):
+        source, rel_type, target = spec
+        query = f"""
+            UNWIND $rows AS row
+            MATCH (a:{source} {{{self.keys[source]}: row.source}})
+            MATCH (b:{target} {{{self.keys[target]}: row.target}})
+            MERGE (a)-[r:{rel_type}]->(b)
+            SET r = row.props
+            """
+        count = 0
+        for batch in batched(dataset.relationships(spec), self.batch_size):
+            self.graph.query(query, {"rows": batch}, bump_version=False)
+            count += len(batch)
+        return count
+
+    def load(self, dataset) -> dict:
+        self.graph.init_schema()
+        self.graph.connect()
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            node_counts = dict(zip(NODE_SPECS, pool.map(lambda label: self.load_nodes(dataset, label), NODE_SPECS)))
+        node_seconds = time.perf_counter() - started
+
+        rel_counts = {spec[1]: self.load_relationships(dataset, spec) for spec in RELATIONSHIP_SPECS}
+        seconds = time.perf_counter() - started
+        self.graph.bump_version()
+
+        nodes = sum(node_counts.values())
+        relationships = sum(rel_counts.values())
+        return {
+            "nodes": node_counts,
+            "relationships": rel_counts,
+            "node_seconds": round(node_seconds, 3),
+            "seconds": round(seconds, 3),
+            "nodes_per_second": round(nodes / node_seconds, 1) if node_seconds else None,
+            "relationships_per_second": round(relationships / (seconds - node_seconds), 1) if seconds > node_seconds else None,
+        }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate and bulk-load a synthetic ITC BLIDA graph.")
+    parser.add_argument("--members", type=int, default=10000)
+    parser.add_argument("--fanout", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    dataset = SyntheticGraph(members=args.members, fanout=args.fanout, seed=args.seed)
+    print(f"Loading synthetic graph: {dataset.counts}")
+    try:
+        report = BulkLoader(batch_size=args.batch_size, workers=args.workers).load(dataset)
+        for label, count in report["nodes"].items():
+            print(f"{label}: {count} nodes")
+        for rel_type, count in report["relationships"].items():
+            print(f"{rel_type}: {count} relationships")
+        print(f"Nodes: {report['nodes_per_second']} nodes/s over {report['node_seconds']}s")
+        print(f"Total: {report['seconds']}s ({report['relationships_per_second']} relationships/s)")
+    finally:
+        graph_db.close()
@@ -0,0 +1,163 @@
+import re
+from dataclasses import dataclass, field
+
+from app.cache import fold
+from app.graph import unique_keys
+from app.specs import NODE_SPECS
+
+
+@dataclass(frozen=True)
+class CypherTemplate:
+    """A parameterized query for one question shape over one entity label.
+
+    `intent` is matched against the folded question (lowercase, no punctuation); the
+    entity named in the question fills `$name`.
+    """
+
+    name: str
+    label: str
+    intent: str
+    query: str
+    pattern: re.Pattern = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        object.__setattr__(self, "pattern", re.compile(self.intent))
+
+    def matches(self, folded_question: str) -> bool:
+        return self.pattern.search(folded_question) is not None
+
+
+# Ordered from most to least specific; the first template whose intent and entity label
+# both match wins. Relationship directions follow the schema (app/specs.py, app/schema.py).
+TEMPLATES = [
+    CypherTemplate(
+        "event_organizers", "Event",
+        r"\bwho (?:organi[sz]e[sd]?|runs|ran|is organi[sz]ing|are organi[sz]ing)\b|\borgani[sz]ers?\b",
+        "MATCH (m:Member)-[:ORGANIZES]->(e:Event {name: $name}) RETURN m.name AS organizer, m.role AS role",
+    ),
+    CypherTemplate(
+        "event_sponsors", "Event",
+        r"\b(?:sponsor|sponsors|sponsored|sponsoring|support|supports|supported|partners?)\b",
+        "MATCH (p:Partner)-[:SPONSORS]->(e:Event {name: $name}) RETURN p.name AS sponsor, p.kind AS kind",
+    ),
+    CypherTemplate(
+        "event_hosts", "Event",
+        r"\b(?:which|what) departments? (?:hosts?|hosted|is hosting)\b|\bhosts?\b|\bhosted\b",
+        "MATCH (d:Department)-[:HOSTS]->(e:Event {name: $name}) RETURN d.name AS department",
+    ),
+    CypherTemplate(
+        "event_projects", "Event",
+        r"\bprojects?\b",
+        "MATCH (p:Project)-[:FEATURED_IN]->(e:Event {name: $name}) RETURN p.name AS project, p.status AS status",
+    ),
+    CypherTemplate(
+        "project_supporters", "Project",
+        r"\b(?:sponsor|sponsors|sponsored|support|supports|supported|partners?)\b",
+        "MATCH (p:Partner)-[:SUPPORTS]->(pr:Project {name: $name}) RETURN p.name AS supporter, p.kind AS kind",
+    ),
+    CypherTemplate(
+        "project_contributors", "Project",
+        r"\b(?:contribut\w*|works? on|working on|worked on|built|builds|team)\b",
+        "MATCH (m:Member)-[c:CONTRIBUTES_TO]->(p:Project {name: $name}) RETURN m.name AS contributor, c.scope AS scope",
+    ),
+    CypherTemplate(
+        "project_lead", "Project",
+        r"\b(?:leads?|led|leading|in charge|responsible|owns?)\b",
+        "MATCH (d:Department)-[:LEADS]->(p:Project {name: $name}) RETURN d.name AS department",
+    ),
+    CypherTemplate(
+        "project_events", "Project",
+        r"\b(?:featured|showcased|presented|shown|events?)\b",
+        "MATCH (p:Project {name: $name})-[:FEATURED_IN]->(e:Event) RETURN e.name AS event, e.date AS date",
+    ),
+    CypherTemplate(
+        "department_events", "Department",
+        r"\bevents?\b|\bhosts?\b|\bhosted\b",
+        "MATCH (d:Department {name: $name})-[:HOSTS]->(e:Event) RETURN e.name AS event, e.date AS date",
+    ),
+    CypherTemplate(
+        "department_projects", "Department",
+        r"\bprojects?\b",
+        "MATCH (d:Department {name: $name})-[:LEADS]->(p:Project) RETURN p.name AS project, p.status AS status",
+    ),
+    CypherTemplate(
+        "department_members", "Department",
+        r"\b(?:who|members?|head|heads|leader|team|part of|belongs?)\b",
+        "MATCH (m:Member)-[:MEMBER_OF]->(d:Department {name: $name}) RETURN m.name AS member, m.role AS role",
+    ),
+    CypherTemplate(
+        "member_department", "Member",
+        r"\bdepartments?\b|\bwhich team\b",
+        "MATCH (m:Member {name: $name})-[:MEMBER_OF]->(d:Department) RETURN d.name AS department",
+    ),
+    CypherTemplate(
+        "member_events", "Member",
+        r"\bevents?\b|\borgani[sz]\w*\b",
+        "MATCH (m:Member {name: $name})-[:ORGANIZES]->(e:Event) RETURN e.name AS event, e.date AS date",
+    ),
+    CypherTemplate(
+        "partner_events", "Partner",
+        r"\bevents?\b|\bsponsor\w*\b",
+        "MATCH (p:Partner {name: $name})-[:SPONSORS]->(e:Event) RETURN e.name AS event, e.date AS date",
+    ),
+    CypherTemplate(
+        "partner_projects", "Partner",
+        r"\bprojects?\b|\bsupport\w*\b",
+        "MATCH (p:Partner {name: $name})-[:SUPPORTS]->(pr:Project) RETURN pr.name AS project, pr.status AS status",
+    ),
+]
+
+# "Tell me about X" falls back to the entity's own properties.
+ABOUT_INTENT = r"\b(?:tell me about|what is|what s|what are|describe|details|info|information|who is|who are|when is|when was|where is|where was)\b"
+ABOUT_PATTERN = re.compile(ABOUT_INTENT)
+# Counting, ranking and comparison wording asks for something the templates' plain lists
+# do not answer ("How many organizers does ITC TALKS 5.0 have?").
+AGGREGATE_PATTERN = re.compile(
+    r"\b(?:how many|how much|number of|count|counts|total|most|least|fewest|more than|less than|fewer than"
+    r"|latest|earliest|newest|oldest|first|last|biggest|largest|smallest|average|compare|compared)\b"
+)
+
+
+def _about_query(label, key, parameter):
+    properties = NODE_SPECS[label][1]
+    return f"MATCH (n:{label} {{{key}: ${parameter}}}) RETURN n {{{', '.join('.' + p for p in properties)}}} AS {label.lower()}"
+
+
+for _label in NODE_SPECS:
+    TEMPLATES.append(CypherTemplate(f"{_label.lower()}_about", _label, ABOUT_INTENT, _about_query(_label, "name", "name")))
+
+# The same projection fetched by unique key ($key), for nodes resolved by the search index.
+KEY_LOOKUPS = {
+    label: CypherTemplate(f"{label.lower()}_by_key", label, ABOUT_INTENT, _about_query(label, key, "key"))
+    for label, key in unique_keys().items()
+}
+
+
+def is_aggregate(question: str) -> bool:
+    """True for counting, ranking and comparison questions."""
+    return AGGREGATE_PATTERN.search(fold(question)) is not None
+
+
+def is_descriptive(question: str) -> bool:
+    """True for 'tell me about X' / 'what is X' style questions."""
+    return ABOUT_PATTERN.search(fold(question)) is not None and not is_aggregate(question)
+
+
+def match_template(question: str, entities):
+    """Returns (template, parameters) for the first template matching the question, else None.
+
+    `entities` is the (label, name) list found in the question by the local classifier's
+    entity index. Questions naming several entities, or asking to count, rank or compare,
+    carry constraints no single-entity template can express, so they are left to the LLM.
+    """
+    if len(entities) != 1:
+        return None
+    label, name = entities[0]
+    folded = fold(question)
+    # The entity's own name ("First Steps Workshop") does not make the question a count.
+    if is_aggregate(f" {folded} ".replace(f" {fold(name)} ", " ")):
+        return None
+    for template in TEMPLATES:
+        if template.label == label and template.matches(folded):
+            return template, {"name": name}
+    return None
@@ -0,0 +1,196 @@
+import os
+import re
+
+from dotenv import load_dotenv
+from neo4j.exceptions import ClientError
+
+from app.graph import is_write_query
+
+load_dotenv()
+
+# Also ask Neo4j to plan generated Cypher (EXPLAIN) before running it; catches syntax the
+# local checks do not understand, at the cost of a round-trip.
+CYPHER_EXPLAIN = os.getenv("CYPHER_EXPLAIN", "0") == "1"
+
+_FENCE = re.compile(r"^\s*```[\w-]*\s*\n?|\n?\s*```\s*$")
+_LANGUAGE_LINE = re.compile(r"^\s*(?:cypher|neo4j)\s*:?\s*\n", re.I)
+_STRING = re.compile(r"'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"")
+_COMMENT = re.compile(r"//[^\n]*|/\*.*?\*/", re.S)
+
+_NAME = r"`[^`]+`|[A-Za-z_]\w*"
+_NODE = re.compile(
+    rf"\(\s*(?P<var>[A-Za-z_]\w*)?\s*(?P<labels>(?::\s*(?:{_NAME})\s*)*)(?P<props>\{{[^{{}}]*\}})?\s*\)"
+)
+_REL = re.compile(r"\s*(?P<left><)?-\s*(?:\[(?P<body>[^\[\]]*)\])?\s*-(?P<right>>)?\s*")
+_REL_BODY = re.compile(
+    rf"^\s*(?P<var>[A-Za-z_]\w*)?\s*(?::\s*(?P<types>(?:{_NAME})(?:\s*\|\s*:?\s*(?:{_NAME}))*))?"
+    r"\s*(?P<length>\*[\d.\s]*)?\s*(?P<props>\{[^{}]*\})?\s*$"
+)
+_LABEL = re.compile(rf":\s*({_NAME})")
+_MAP_KEY = re.compile(r"(?:^|,)\s*([A-Za-z_]\w*)\s*:")
+_PROPERTY = re.compile(r"(?<![\w.$])([A-Za-z_]\w*)\.([A-Za-z_]\w*)\b")
+_PROJECTION = re.compile(r"(?<![\w:])([A-Za-z_]\w*)\s*\{([^{}]*)\}")
+
+
+def clean_cypher(text: str) -> str:
+    """Strips markdown fences, a leading language tag and a trailing semicolon from LLM output."""
+    query = _FENCE.sub("", text.strip())
+    query = _LANGUAGE_LINE.sub("", query)
+    return query.strip().rstrip(";").strip()
+
+
+def _name(text):
+    return text.strip().strip("`")
+
+
+def _mask(query):
+    """Replaces string literals with '' and drops comments, so patterns inside them are ignored."""
+    return _STRING.sub("''", _COMMENT.sub(" ", query))
+
+
+def _chains(masked):
+    """Yields each pattern as [node, (rel, node), ...] with node/rel as regex matches."""
+    position = 0
+    while True:
+        node = _NODE.search(masked, position)
+        if node is None:
+            return
+        # A '(' right after a name is a function call, not a pattern.
+        if node.start() and (masked[node.start() - 1].isalnum() or masked[node.start() - 1] == "_"):
+            position = node.start() + 1
+            continue
+        chain, end = [node], node.end()
+        while True:
+            rel = _REL.match(masked, end)
+            following = _NODE.match(masked, rel.end()) if rel else None
+            if following is None:
+                break
+            chain.append((rel, following))
+            end = following.end()
+        yield chain
+        position = end
+
+
+def validate_cypher(query: str, schema) -> list:
+    """Problems with `query` against `schema` (a GraphSchema), as messages the LLM can act on.
+
+    Checks read-only-ness, node labels, relationship types and directions, and the
+    properties read from variables whose label or type is known. Constructs it does not
+    understand are passed over rather than reported.
+    """
+    errors = []
+    if not query:
+        return ["The query is empty."]
+    if "```" in query:
+        errors.append("Remove the markdown code fence; return plain Cypher.")
+    if is_write_query(query):
+        errors.append("The query must be read-only (no CREATE, MERGE, SET, DELETE or REMOVE).")
+    masked = _mask(query)
+    chains = list(_chains(masked))
+    patterns = set(schema.patterns)
+
+    # Variables bound to labels / relationship types anywhere in the query.
+    node_vars, rel_vars = {}, {}
+    for chain in chains:
+        for node in [chain[0], *(following for _rel, following in chain[1:])]:
+            labels = [_name(label) for label in _LABEL.findall(node["labels"] or "")]
+            for label in labels:
+                if label not in schema.nodes:
+                    errors.append(f"Unknown label :{label}. Labels: {', '.join(schema.nodes)}.")
+            if node["var"] and labels:
+                node_vars.setdefault(node["var"], set()).update(l for l in labels if l in schema.nodes)
+        for rel, _following in chain[1:]:
+            body = _REL_BODY.match(rel["body"] or "")
+            if body is None:
+                continue
+            types = [_name(t.lstrip(":")) for t in (body["types"] or "").split("|") if t.strip()]
+            for rel_type in types:
+                if rel_type not in schema.relationships:
+                    errors.append(
+                        f"Unknown relationship type :{rel_type}. Types: {', '.join(schema.relationships)}."
+                    )
+            if body["var"] and types:
+                rel_vars.setdefault(body["var"], set()).update(t for t in types if t in schema.relationships)
+
+    def labels_of(node):
+        labels = {_name(label) for label in _LABEL.findall(node["labels"] or "")} & set(schema.nodes)
+        return labels or node_vars.get(node["var"], set())
+
+    # Directions: each hop must exist in the schema, in the direction written.
+    for chain in chains:
+        previous = chain[0]
+        for rel, following in chain[1:]:
+            body = _REL_BODY.match(rel["body"] or "")
+            types = [_name(t.lstrip(":")) for t in (body["types"] or "").split("|") if t.strip()] if body else []
+            types = [t for t in types if t in schema.relationships]
+            if types and not (body["length"] or "").strip():
+                left, right = labels_of(previous), labels_of(following)
+                if rel["left"] and not rel["right"]:
+                    left, right = right, left
+                undirected = bool(rel["left"]) == bool(rel["right"])
+                if not _hop_allowed(patterns, left, types, right, undirected):
+                    written = f"({_labels_text(left)})-[:{'|'.join(types)}]->({_labels_text(right)})"
+                    allowed = "; ".join(
+                        f"(:{s})-[:{t}]->(:{e})" for s, t, e in sorted(patterns) if t in types
+                    )
+                    errors.append(f"{written} is not in the schema. Allowed: {allowed}.")
+            previous = following
+
+    # Properties read from known variables, in patterns, projections and expressions.
+    def check_property(var, prop):
+        if var in node_vars and node_vars[var]:
+            known = set().union(*(schema.properties(label) for label in node_vars[var]))
+            if prop not in known:
+                owner = "/".join(sorted(node_vars[var]))
+                errors.append(f"{owner} has no property '{prop}'. Properties: {', '.join(sorted(known))}.")
+        elif var in rel_vars and rel_vars[var]:
+            known = set().union(*(schema.relationships[t] for t in rel_vars[var]))
+            if prop not in known:
+                owner = "|".join(sorted(rel_vars[var]))
+                listed = ", ".join(sorted(known)) or "none"
+                errors.append(f"Relationship :{owner} has no property '{prop}'. Properties: {listed}.")
+
+    for chain in chains:
+        for node in [chain[0], *(following for _rel, following in chain[1:])]:
+            labels = labels_of(node)
+            for key in _MAP_KEY.findall((node["props"] or "{}")[1:-1]):
+                if labels and key not in set().union(*(schema.properties(label) for label in labels)):
+                    errors.append(f"{'/'.join(sorted(labels))} has no property '{key}'.")
+    for var, items in _PROJECTION.findall(masked):
+        for item in items.split(","):
+            item = item.strip()
+            if item.startswith(".") and item[1:].strip() != "*":
+                check_property(var, item[1:].strip())
+    for var, prop in _PROPERTY.findall(masked):
+        check_property(var, prop)
+
+    return list(dict.fromkeys(errors))
+
+
+def _labels_text(labels):
+    return ":" + "|".join(sorted(labels)) if labels else ""
+
+
+def _hop_allowed(patterns, left, types, right, undirected):
+    """True when some known pattern matches the hop; unknown endpoints match any label."""
+    for source, rel_type, target in patterns:
+        if rel_type not in types:
+            continue
+        if (not left or source in left) and (not right or target in right):
+            return True
+        if undirected and (not right or source in right) and (not left or target in left):
+            return True
+    return False
+
+
+async def explain_errors(graph, query, parameters=None) -> list:
+    """Neo4j's planning errors for `query` (EXPLAIN, nothing is executed); [] when it plans."""
+    try:
+        await graph.query(f"EXPLAIN {query}", parameters, bump_version=False)
+    except ClientError as e:
+        return [e.message or str(e)]
+    except Exception as e:
+        # Backends without EXPLAIN (the in-memory snapshot) or a connectivity problem: the
+        # local checks stand on their own.
+        print(f"EXPLAIN skipped: {e}")
+    return []
@@ -0,0 +1,31 @@
+import pytest
+
+from app.answers import NOT_FOUND, render_answer
+
+
+@pytest.mark.parametrize("rows, answer", [
+    ([], NOT_FOUND),
+    ([{"organizer": None}], NOT_FOUND),
+    ([{"m.name": "Design Lead Group"}], "Name: Design Lead Group."),
+    ([{"event": "DesignCraft"}, {"event": "ITC TALKS 5.0"}], "Events: DesignCraft and ITC TALKS 5.0."),
+    ([{"organizer": "Design Lead Group", "role": "Design Leads"}], "Design Lead Group (role: Design Leads)."),
+    ([{"Event name": "DesignCraft"}], "Event name: DesignCraft."),
+    ([{"n": 3}], "Result: 3."),
+    # Unaliased aggregates the LLM writes.
+    ([{"count(m)": 3}], "Count: 3."),
+    ([{"count(DISTINCT e)": 2}], "Count: 2."),
+    ([{"collect(m.name)": ["A", "B"]}], "Name: A and B."),
+])
+def test_renders_small_flat_results(rows, answer):
+    assert render_answer(rows) == answer
+
+
+@pytest.mark.parametrize("rows", [
+    [{"toLower(e.name)": "designcraft"}],
+    [{"size(collect(m))": 2}],
+    [{"e.date.year": 2024}],
+    [{"event": {"name": "DesignCraft"}}],
+    [{"description": "x" * 200}],
+])
+def test_leaves_the_rest_to_the_llm(rows):
+    assert render_answer(rows) is None
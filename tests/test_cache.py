@@ -0,0 +1,40 @@
+from app.cache import CypherCache, normalize_question
+
+ENTITIES = [("Event", "DesignCraft"), ("Event", "ITC TALKS 5.0"), ("Department", "Design"), ("Project", "AI Study Track")]
+
+
+def cache():
+    c = CypherCache()
+    c.set_entities(ENTITIES)
+    return c
+
+
+def test_slots_carry_the_label():
+    c = cache()
+    assert normalize_question("Who sponsors DesignCraft?", c.entities) == ("who sponsors <Event:0>", ["DesignCraft"])
+    assert normalize_question("Who sponsors Design?", c.entities) == ("who sponsors <Department:0>", ["Design"])
+
+
+def test_slotted_query_serves_other_entities_of_the_same_label():
+    c = cache()
+    c.put("Who sponsors DesignCraft?", "MATCH (p:Partner)-[:SPONSORS]->(e:Event {name: 'DesignCraft'}) RETURN p.name")
+    assert c.get("who sponsors ITC TALKS 5.0") == (
+        "MATCH (p:Partner)-[:SPONSORS]->(e:Event {name: 'ITC TALKS 5.0'}) RETURN p.name"
+    )
+    assert c.get("Who sponsors Design?") is None
+
+
+def test_only_whole_literals_are_slotted():
+    c = cache()
+    query = "MATCH (p:Project) WHERE toLower(p.name) CONTAINS 'ai study track' RETURN p.description AS about"
+    c.put("What is AI Study Track?", query)
+    c.set_entities(ENTITIES + [("Project", "O'Brien Lab")])
+    assert c.get("What is O'Brien Lab?") == query.replace("'ai study track'", "'o\\'brien lab'")
+
+
+def test_queries_without_the_literal_are_cached_verbatim():
+    c = cache()
+    query = "MATCH (d:Department)-[:HOSTS]->(e:Event) WHERE e.name CONTAINS 'Craft' RETURN d.name"
+    c.put("Who hosts DesignCraft?", query)
+    assert c.get("who hosts designcraft") == query
+    assert c.get("Who hosts ITC TALKS 5.0?") is None
@@ -0,0 +1,45 @@
+import pytest
+
+from app.classifier import LocalClassifier
+
+
+@pytest.fixture
+def classifier():
+    c = LocalClassifier()
+    c.index([
+        {"label": "Event", "name": "DesignCraft"},
+        {"label": "Event", "name": "ITC TALKS 5.0"},
+        {"label": "Department", "name": "Design"},
+    ])
+    return c
+
+
+@pytest.mark.parametrize("question", [
+    "Who organizes DesignCraft?",
+    "When is ITC TALKS 5.0?",
+    "What events does ITC organize?",
+    "Hi, who organizes DesignCraft?",
+])
+def test_entity_names_and_club_terms_route_to_the_graph(classifier, question):
+    assert classifier.classify(question) == "graph"
+
+
+@pytest.mark.parametrize("question", [
+    "hi", "Hello there!", "Thanks a lot!", "Thank you very much", "How are you today?", "Who are you?",
+    "What can you do?",
+])
+def test_bare_conversational_cues_are_general(classifier, question):
+    assert classifier.classify(question) == "general"
+
+
+@pytest.mark.parametrize("question", [
+    # A greeting followed by a topic is for the LLM to judge.
+    "Hi! Tell me about the Smart Campus App",
+    "Hey, how do I sort a list in Python?",
+    # Schema vocabulary alone is not enough.
+    "How do I format a date in Python?",
+    "What is the best project structure for a team?",
+    "Tell me about the Design",
+])
+def test_everything_else_is_left_to_the_llm(classifier, question):
+    assert classifier.classify(question) is None
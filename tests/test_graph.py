@@ -0,0 +1,76 @@
+import pytest
+
+from app.graph import BUMP_VERSION_QUERY, Neo4jGraph, UnsafeQueryError, guard_read_query, rewrite_for_indexes
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("MATCH (n) RETURN n", "MATCH (n) RETURN n\nLIMIT 100"),
+    ("MATCH (n) RETURN n LIMIT 5", "MATCH (n) RETURN n LIMIT 5"),
+    ("MATCH (n) RETURN n LIMIT 5;", "MATCH (n) RETURN n LIMIT 5"),
+    ("MATCH (n) RETURN n LIMIT 5 // top five", "MATCH (n) RETURN n LIMIT 5"),
+    ("MATCH (n) RETURN n LIMIT $k /* paged */ ;", "MATCH (n) RETURN n LIMIT $k"),
+    ("MATCH (n) RETURN n;\n// done\n", "MATCH (n) RETURN n\nLIMIT 100"),
+    ("MATCH (n) // all nodes\nRETURN n", "MATCH (n) // all nodes\nRETURN n\nLIMIT 100"),
+    ("MATCH (n) WHERE n.name = 'a // LIMIT 5' RETURN n", "MATCH (n) WHERE n.name = 'a // LIMIT 5' RETURN n\nLIMIT 100"),
+])
+def test_guard_read_query_limits(query, expected):
+    assert guard_read_query(query, 100) == expected
+
+
+def test_guard_read_query_rejects_writes():
+    with pytest.raises(UnsafeQueryError):
+        guard_read_query("MATCH (n) DETACH DELETE n // cleanup", 100)
+
+
+
+def test_rewrite_lowercase_equality_uses_the_normalized_property():
+    assert rewrite_for_indexes("MATCH (e:Event) WHERE toLower(e.name) = 'designcraft' RETURN e") == (
+        "MATCH (e:Event) WHERE e.name_lower = 'designcraft' RETURN e"
+    )
+
+
+def test_rewrite_contains_uses_the_fulltext_index_and_keeps_the_filter():
+    assert rewrite_for_indexes("MATCH (e:Event) WHERE toLower(e.name) CONTAINS 'itc talks' RETURN e.name") == (
+        "CALL db.index.fulltext.queryNodes('entity_text', 'name:*itc* AND name:*talks*') YIELD node AS e "
+        "WHERE e:Event AND toLower(e.name) CONTAINS 'itc talks' RETURN e.name"
+    )
+
+
+@pytest.mark.parametrize("query", [
+    # Mixed-case literals can never equal toLower(...); leave them to fail as written.
+    "MATCH (e:Event) WHERE toLower(e.name) = 'DesignCraft' RETURN e",
+    # OPTIONAL MATCH must still yield a row when nothing matches.
+    "MATCH (m:Member) OPTIONAL MATCH (e:Event) WHERE toLower(e.name) CONTAINS 'itc' RETURN m, e",
+    "MATCH (m:Member) optional\n  match (e:Event) WHERE toLower(e.name) CONTAINS 'itc' RETURN m, e",
+    # OR/NOT widen the match beyond what the index returns.
+    "MATCH (e:Event) WHERE toLower(e.name) CONTAINS 'itc' OR e.format = 'Conference' RETURN e",
+    # Not a full-text property.
+    "MATCH (e:Event) WHERE toLower(e.location) CONTAINS 'blida' RETURN e",
+    # Not an entity label.
+    "MATCH (v:GraphVersion) WHERE toLower(v.name) CONTAINS 'graph' RETURN v",
+])
+def test_rewrite_leaves_other_queries_alone(query):
+    assert rewrite_for_indexes(query) == query
+
+class RecordingGraph(Neo4jGraph):
+    """Neo4jGraph that records the Cypher it would send instead of running it."""
+
+    def __init__(self):
+        super().__init__()
+        self.sent = []
+
+    def _run(self, query, parameters=None):
+        self.sent.append(query)
+        return [{"value": "v2"}]
+
+
+def test_init_schema_does_not_bump_the_version():
+    graph = RecordingGraph()
+    graph.init_schema()
+    assert graph.sent and BUMP_VERSION_QUERY not in graph.sent
+
+
+def test_writes_bump_the_version_once():
+    graph = RecordingGraph()
+    graph.query("MATCH (n:Event {name: 'x'}) SET n.theme = 'y'")
+    assert graph.sent.count(BUMP_VERSION_QUERY) == 1
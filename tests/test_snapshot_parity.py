@@ -0,0 +1,194 @@
+"""The dataset snapshot must answer the request-path queries the way the seeded Neo4j graph does.
+
+Expected rows are derived straight from app/data/*.json, independently of the seed and
+snapshot code, so a divergence in either the interpreter or the seeding shows up here.
+"""
+import asyncio
+import json
+import os
+
+import pytest
+
+from app.graph import unique_keys
+from app.snapshot import SnapshotGraph
+from app.specs import NODE_SPECS
+from app.templates import KEY_LOOKUPS, TEMPLATES
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), os.pardir, "app", "data")
+
+
+def _load(name):
+    with open(os.path.join(DATA_DIR, f"{name}.json"), encoding="utf-8") as f:
+        return json.load(f)
+
+
+MEMBERS = _load("members")
+DEPARTMENTS = _load("departments")
+EVENTS = _load("events")
+PROJECTS = _load("projects")
+PARTNERS = _load("partners")
+HOSTINGS = _load("hostings")
+CONTRIBUTIONS = _load("contributions")
+
+NODES = {"Member": MEMBERS, "Department": DEPARTMENTS, "Event": EVENTS, "Project": PROJECTS, "Partner": PARTNERS}
+MEMBER_BY_ID = {m["id"]: m for m in MEMBERS}
+EVENT_BY_NAME = {e["name"]: e for e in EVENTS}
+PROJECT_BY_NAME = {p["name"]: p for p in PROJECTS}
+
+
+def _event(name):
+    return {"event": name, "date": EVENT_BY_NAME[name]["date"]}
+
+
+def _project(name):
+    return {"project": name, "status": PROJECT_BY_NAME[name]["status"]}
+
+
+# Template name -> rows expected for the entity `name`, read off the JSON files.
+EXPECTED = {
+    "event_organizers": lambda name: [
+        {"organizer": m["name"], "role": m["role"]} for m in MEMBERS if name in m["organizes"]
+    ],
+    "event_sponsors": lambda name: [
+        {"sponsor": p["name"], "kind": p["kind"]} for p in PARTNERS if name in p["supports_events"]
+    ],
+    "event_hosts": lambda name: [{"department": h["department"]} for h in HOSTINGS if h["event"] == name],
+    "event_projects": lambda name: [_project(p["name"]) for p in PROJECTS if name in p["showcased_at"]],
+    "project_supporters": lambda name: [
+        {"supporter": p["name"], "kind": p["kind"]} for p in PARTNERS if name in p["supports_projects"]
+    ],
+    "project_contributors": lambda name: [
+        {"contributor": MEMBER_BY_ID[c["member_id"]]["name"], "scope": c["scope"]}
+        for c in CONTRIBUTIONS if c["project"] == name
+    ],
+    "project_lead": lambda name: [{"department": PROJECT_BY_NAME[name]["lead_department"]}],
+    "project_events": lambda name: [_event(e) for e in PROJECT_BY_NAME[name]["showcased_at"]],
+    "department_events": lambda name: [_event(h["event"]) for h in HOSTINGS if h["department"] == name],
+    "department_projects": lambda name: [_project(p["name"]) for p in PROJECTS if p["lead_department"] == name],
+    "department_members": lambda name: [
+        {"member": m["name"], "role": m["role"]} for m in MEMBERS if m["department"] == name
+    ],
+    "member_department": lambda name: [
+        {"department": m["department"]} for m in MEMBERS if m["name"] == name
+    ],
+    "member_events": lambda name: [
+        _event(e) for m in MEMBERS if m["name"] == name for e in m["organizes"]
+    ],
+    "partner_events": lambda name: [
+        _event(e) for p in PARTNERS if p["name"] == name for e in p["supports_events"]
+    ],
+    "partner_projects": lambda name: [
+        _project(pr) for p in PARTNERS if p["name"] == name for pr in p["supports_projects"]
+    ],
+}
+
+
+def _properties(label, row):
+    return {p: row.get(p) for p in NODE_SPECS[label][1]}
+
+
+@pytest.fixture(scope="module")
+def graph():
+    return SnapshotGraph.from_dataset()
+
+
+def run(graph, query, parameters=None):
+    return asyncio.run(graph.query(query, parameters))
+
+
+def unordered(rows):
+    return sorted(rows, key=lambda row: json.dumps(row, sort_keys=True))
+
+
+def test_every_template_has_an_expectation():
+    named = {t.name for t in TEMPLATES if not t.name.endswith("_about")}
+    assert named == set(EXPECTED)
+
+
+@pytest.mark.parametrize("template", [t for t in TEMPLATES if not t.name.endswith("_about")], ids=lambda t: t.name)
+def test_relationship_templates(graph, template):
+    for row in NODES[template.label]:
+        name = row["name"]
+        assert unordered(run(graph, template.query, {"name": name})) == unordered(EXPECTED[template.name](name)), name
+
+
+@pytest.mark.parametrize("template", [t for t in TEMPLATES if t.name.endswith("_about")], ids=lambda t: t.name)
+def test_about_templates(graph, template):
+    alias = template.label.lower()
+    for row in NODES[template.label]:
+        assert run(graph, template.query, {"name": row["name"]}) == [{alias: _properties(template.label, row)}]
+
+
+@pytest.mark.parametrize("label", sorted(KEY_LOOKUPS))
+def test_key_lookups(graph, label):
+    key = unique_keys()[label]
+    for row in NODES[label]:
+        result = run(graph, KEY_LOOKUPS[label].query, {"key": row[key]})
+        assert result == [{label.lower(): _properties(label, row)}]
+
+
+def test_unknown_entity_returns_no_rows(graph):
+    assert run(graph, TEMPLATES[0].query, {"name": "No Such Event"}) == []
+
+
+# Shapes the LLM generates for questions no template covers.
+def test_generated_case_insensitive_contains(graph):
+    rows = run(graph, "MATCH (e:Event) WHERE toLower(e.name) CONTAINS 'talks' RETURN e.name AS name ORDER BY e.date")
+    expected = sorted((e for e in EVENTS if "talks" in e["name"].lower()), key=lambda e: e["date"])
+    assert rows == [{"name": e["name"]} for e in expected]
+
+
+def test_generated_aggregation(graph):
+    rows = run(
+        graph,
+        "MATCH (d:Department)-[:HOSTS]->(e:Event) "
+        "RETURN d.name AS department, count(e) AS events ORDER BY events DESC, department",
+    )
+    counts = {}
+    for h in HOSTINGS:
+        counts[h["department"]] = counts.get(h["department"], 0) + 1
+    expected = sorted(counts.items(), key=lambda item: (-item[1], item[0]))
+    assert rows == [{"department": d, "events": n} for d, n in expected]
+
+
+def test_generated_collect_with_filter(graph):
+    rows = run(
+        graph,
+        "MATCH (m:Member)-[:ORGANIZES]->(e:Event) WHERE e.date STARTS WITH '2024' "
+        "RETURN e.name AS event, collect(m.name) AS organizers ORDER BY event",
+    )
+    expected = sorted(e["name"] for e in EVENTS if e["date"].startswith("2024"))
+    assert [r["event"] for r in rows] == expected
+    for r in rows:
+        assert sorted(r["organizers"]) == sorted(m["name"] for m in MEMBERS if r["event"] in m["organizes"])
+
+
+def test_generated_relationship_property(graph):
+    rows = run(
+        graph,
+        "MATCH (m:Member)-[c:CONTRIBUTES_TO]->(p:Project) WHERE p.year >= 2024 "
+        "RETURN p.name AS project, m.name AS member, c.scope AS scope",
+    )
+    expected = [
+        {"project": c["project"], "member": MEMBER_BY_ID[c["member_id"]]["name"], "scope": c["scope"]}
+        for c in CONTRIBUTIONS if PROJECT_BY_NAME[c["project"]]["year"] >= 2024
+    ]
+    assert unordered(rows) == unordered(expected)
+
+
+def test_integer_division_and_modulo_truncate_toward_zero(graph):
+    rows = run(
+        graph,
+        "MATCH (p:Project {name: 'ITC Website'}) "
+        "RETURN -7 / 2 AS a, 7 / -2 AS b, 7 / 2 AS c, -7 % 2 AS d, 7 % -2 AS e, -7.5 % 2 AS f, 7 / 2.0 AS g",
+    )
+    assert rows == [{"a": -3, "b": -3, "c": 3, "d": -1, "e": 1, "f": -1.5, "g": 3.5}]
+
+
+def test_round_takes_halves_up(graph):
+    rows = run(
+        graph,
+        "MATCH (p:Project {name: 'ITC Website'}) "
+        "RETURN round(2.5) AS a, round(0.5) AS b, round(-2.5) AS c, round(2.4) AS d, round(-2.6) AS e",
+    )
+    assert rows == [{"a": 3.0, "b": 1.0, "c": -2.0, "d": 2.0, "e": -3.0}]
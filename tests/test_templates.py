@@ -0,0 +1,40 @@
+import pytest
+
+from app.templates import is_descriptive, match_template
+
+EVENT = [("Event", "ITC TALKS 5.0")]
+
+
+@pytest.mark.parametrize("question, template", [
+    ("Who organizes ITC TALKS 5.0?", "event_organizers"),
+    ("Which partners sponsor ITC TALKS 5.0?", "event_sponsors"),
+    ("Which projects were featured at ITC TALKS 5.0?", "event_projects"),
+    ("Tell me about ITC TALKS 5.0", "event_about"),
+])
+def test_matches_list_questions(question, template):
+    assert match_template(question, EVENT)[0].name == template
+
+
+@pytest.mark.parametrize("question", [
+    "How many organizers does ITC TALKS 5.0 have?",
+    "What is the number of sponsors of ITC TALKS 5.0?",
+    "Count the projects featured at ITC TALKS 5.0",
+    "Who is the latest organizer of ITC TALKS 5.0?",
+    "Which department hosts the most events like ITC TALKS 5.0?",
+])
+def test_leaves_aggregate_questions_to_the_llm(question):
+    assert match_template(question, EVENT) is None
+
+
+def test_aggregate_words_in_the_entity_name_do_not_count():
+    entities = [("Event", "First Steps Workshop")]
+    assert match_template("Who organizes First Steps Workshop?", entities)[0].name == "event_organizers"
+
+
+def test_leaves_questions_about_several_entities_to_the_llm():
+    assert match_template("Who organizes DesignCraft and ITC TALKS 5.0?", EVENT + [("Event", "DesignCraft")]) is None
+
+
+def test_aggregate_questions_are_not_descriptive():
+    assert is_descriptive("What is the website project?")
+    assert not is_descriptive("What is the number of projects?")
@@ -0,0 +1,68 @@
+import pytest
+
+from app.schema import GraphSchema
+from app.validation import clean_cypher, validate_cypher
+
+SCHEMA = GraphSchema.from_specs()
+
+
+@pytest.mark.parametrize("query", [
+    "MATCH (m:Member)-[:ORGANIZES]->(e:Event {name: 'DesignCraft'}) RETURN m.name, m.role",
+    # Inbound arrows are the same hop written the other way round.
+    "MATCH (e:Event {name: 'DesignCraft'})<-[:ORGANIZES]-(m:Member) RETURN m.name",
+    "MATCH (e:Event)-[:ORGANIZES|SPONSORS]-(x) RETURN x.name",
+    "MATCH (m:Member)-[:ORGANIZES]->(e:Event) RETURN m {.name, .role} AS member, m {.*} AS everything",
+    "MATCH (e:Event) WHERE e.date.year = 2024 RETURN e.name",
+    "MATCH (d:Department) RETURN d.name, [(d)-[:HOSTS]->(e:Event) | e.name] AS events",
+    "MATCH (p:Project) WHERE exists { (p)-[:FEATURED_IN]->(:Event) } RETURN p.name",
+    "MATCH (m:Member)-[c:CONTRIBUTES_TO]->(p:Project) RETURN c.scope, p.year",
+    "MATCH (e:Event) WHERE toLower(e.name) CONTAINS 'talks' RETURN count(e) AS events",
+    "MATCH p = (m:Member)-[*1..2]-(e:Event) RETURN length(p)",
+    # Patterns inside strings and comments are not checked.
+    "MATCH (n:Event) WHERE n.name = 'a (b:Foo)-[:BAR]->()' RETURN n.name // (x:Baz)",
+])
+def test_valid_queries_pass(query):
+    assert validate_cypher(query, SCHEMA) == []
+
+
+@pytest.mark.parametrize("query, message", [
+    ("", "The query is empty."),
+    ("```cypher\nMATCH (e:Event) RETURN e.name\n```", "Remove the markdown code fence; return plain Cypher."),
+    ("MATCH (e:Event) SET e.name = 'x'", "The query must be read-only"),
+    ("MATCH (e:Workshop) RETURN e.name", "Unknown label :Workshop."),
+    ("MATCH (m:Member)-[:ORGANISES]->(e:Event) RETURN m.name", "Unknown relationship type :ORGANISES."),
+    (
+        "MATCH (e:Event)-[:ORGANIZES]->(m:Member) RETURN m.name",
+        "(:Event)-[:ORGANIZES]->(:Member) is not in the schema. Allowed: (:Member)-[:ORGANIZES]->(:Event).",
+    ),
+    (
+        "MATCH (m:Member)<-[:MEMBER_OF]-(d:Department) RETURN m.name",
+        "(:Department)-[:MEMBER_OF]->(:Member) is not in the schema.",
+    ),
+    ("MATCH (e:Event) RETURN e.title", "Event has no property 'title'."),
+    ("MATCH (e:Event {title: 'x'}) RETURN e", "Event has no property 'title'."),
+    ("MATCH (m:Member) RETURN m {.name, .nickname}", "Member has no property 'nickname'."),
+    (
+        "MATCH (m:Member)-[c:CONTRIBUTES_TO]->(p:Project) RETURN c.role",
+        "Relationship :CONTRIBUTES_TO has no property 'role'. Properties: scope.",
+    ),
+])
+def test_each_error_class_is_reported(query, message):
+    errors = validate_cypher(query, SCHEMA)
+    assert any(error.startswith(message) for error in errors), errors
+
+
+def test_errors_are_not_repeated():
+    errors = validate_cypher("MATCH (e:Event) WHERE e.title = 'a' OR e.title = 'b' RETURN e.title", SCHEMA)
+    assert errors == [
+        "Event has no property 'title'. Properties: date, description, format, location, name, source, theme."
+    ]
+
+
+@pytest.mark.parametrize("text", [
+    "```cypher\nMATCH (e:Event) RETURN e.name;\n```",
+    "cypher:\nMATCH (e:Event) RETURN e.name",
+    "  MATCH (e:Event) RETURN e.name ;  ",
+])
+def test_clean_cypher_strips_llm_wrapping(text):
+    assert clean_cypher(text) == "MATCH (e:Event) RETURN e.name"
@@ -1,6 +1,7 @@
-from app.agents import agent_app
+import asyncio
+from app.agents import ask_many
 
-def test():
+async def test():
     print("Testing ITC BLIDA Agent...\n")
     
     questions = [
@@ -10,17 +11,16 @@ def test():
         "Hi, are you a robot?", # General
     ]
     
-    for q in questions:
-        print(f"User: {q}")
-        try:
-            res = agent_app.invoke({"question": q})
+    for res in await ask_many(questions):
+        print(f"User: {res['question']}")
+        if res.get('error'):
+            print(f"Error: {res['error']}")
+        else:
             print(f"Agent: {res.get('answer')}")
             print(f"Class: {res.get('classification')}")
             if res.get('context'):
                 print(f"Context: {res['context']}")
-        except Exception as e:
-            print(f"Error: {e}")
         print("-" * 30)
 
 if __name__ == "__main__":
-    test()
+    asyncio.run(test())